@@ -14,11 +14,53 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
-import scipy.io
 import io
 import tempfile
 import os
+import shutil
+import joblib
+from joblib import parallel_config
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.metrics import mean_absolute_error
+from threadpoolctl import threadpool_limits
+
+# orjson is optional — serializes every st.plotly_chart figure in C
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = "orjson"
+except ImportError:
+    pass
+
+from utils.eis_simulation import (
+    F_range,
+    sim_circuit,
+    impedance_planes,
+    equation_svg,
+    CIRCUIT_INFO,
+    MATHTEXT_AVAILABLE,
+)
+from utils.ml_model import (
+    load_and_preprocess_data,
+    save_mat_arrays,
+    make_boosting_regressor,
+    gpu_available,
+    MODEL_COMPRESSION,
+)
+from utils.corrosion_predictor import (
+    load_model as cp_load_model,
+    load_spectrum,
+    load_mat_spectrum,
+    build_feature_matrix,
+    predict_corrosion_batch,
+    classify_risk,
+    classify_risk_batch,
+    create_gauge_svg,
+    get_env_ranges,
+    load_or_train_env_model,
+    predict_from_env,
+)
 
 # ---------------------------------------------------------------------------
 # Page config (must be first Streamlit call)
@@ -33,523 +75,220 @@ st.set_page_config(
 # ---------------------------------------------------------------------------
 # Custom CSS — dark glassmorphism theme
 # ---------------------------------------------------------------------------
-st.markdown("""
-<style>
-/* ── Google Fonts ── */
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&family=JetBrains+Mono:wght@400;500;600&display=swap');
-
-/* ── Keyframe Animations ── */
-@keyframes gradientShift {
-    0%   { background-position: 0% 50%; }
-    50%  { background-position: 100% 50%; }
-    100% { background-position: 0% 50%; }
-}
-@keyframes float {
-    0%, 100% { transform: translateY(0px); }
-    50%      { transform: translateY(-6px); }
-}
-@keyframes pulseGlow {
-    0%, 100% { box-shadow: 0 0 15px rgba(99,102,241,0.2); }
-    50%      { box-shadow: 0 0 30px rgba(99,102,241,0.4), 0 0 60px rgba(139,92,246,0.15); }
-}
-@keyframes slideUp {
-    from { opacity: 0; transform: translateY(20px); }
-    to   { opacity: 1; transform: translateY(0); }
-}
-@keyframes shimmer {
-    0%   { background-position: -200% 0; }
-    100% { background-position: 200% 0; }
-}
-@keyframes borderGlow {
-    0%, 100% { border-color: rgba(99,102,241,0.2); }
-    50%      { border-color: rgba(99,102,241,0.5); }
-}
-@keyframes orb1 {
-    0%, 100% { transform: translate(0, 0) scale(1); }
-    33%      { transform: translate(30px, -50px) scale(1.1); }
-    66%      { transform: translate(-20px, 20px) scale(0.9); }
-}
-@keyframes orb2 {
-    0%, 100% { transform: translate(0, 0) scale(1); }
-    33%      { transform: translate(-40px, 30px) scale(0.9); }
-    66%      { transform: translate(25px, -35px) scale(1.15); }
-}
+# The <style> block has to be re-emitted on every rerun (Streamlit drops
+# elements a run doesn't produce), so cache the finished tag, not just the file
+@st.cache_data(show_spinner=False)
+def _style_tag(path):
+    with open(path, encoding="utf-8") as f:
+        return f"<style>{f.read()}</style>"
 
-/* ── Root variables ── */
-:root {
-    --bg-primary: #06080f;
-    --bg-secondary: #0d1117;
-    --bg-card: rgba(13, 17, 23, 0.75);
-    --bg-card-hover: rgba(22, 27, 38, 0.85);
-    --border-glow: rgba(99, 102, 241, 0.35);
-    --border-subtle: rgba(99, 102, 241, 0.12);
-    --accent-1: #6366f1;
-    --accent-2: #8b5cf6;
-    --accent-3: #06b6d4;
-    --accent-4: #10b981;
-    --accent-5: #f59e0b;
-    --accent-6: #ec4899;
-    --text-primary: #e8edf5;
-    --text-secondary: #8892a4;
-    --text-muted: #4b5563;
-    --gradient-1: linear-gradient(135deg, #6366f1, #8b5cf6, #a78bfa);
-    --gradient-2: linear-gradient(135deg, #06b6d4, #10b981);
-    --gradient-3: linear-gradient(135deg, #f59e0b, #ef4444);
-    --gradient-accent: linear-gradient(135deg, #6366f1 0%, #8b5cf6 40%, #06b6d4 100%);
-    --shadow-sm: 0 2px 8px rgba(0,0,0,0.3);
-    --shadow-md: 0 4px 20px rgba(0,0,0,0.4);
-    --shadow-lg: 0 8px 40px rgba(0,0,0,0.5);
-    --shadow-glow: 0 0 20px rgba(99,102,241,0.15);
-}
 
-/* ── Global ── */
-html, body, [data-testid="stApp"] {
-    font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif !important;
-    color: var(--text-primary) !important;
-}
+st.markdown(
+    _style_tag(os.path.join(os.path.dirname(__file__), "assets", "theme.css")),
+    unsafe_allow_html=True,
+)
 
-/* ── Animated mesh background ── */
-[data-testid="stApp"] {
-    background: var(--bg-primary) !important;
-    position: relative;
-}
-[data-testid="stApp"]::before {
-    content: '';
-    position: fixed;
-    top: -50%;
-    left: -50%;
-    width: 200%;
-    height: 200%;
-    background:
-        radial-gradient(ellipse at 20% 50%, rgba(99,102,241,0.08) 0%, transparent 50%),
-        radial-gradient(ellipse at 80% 20%, rgba(139,92,246,0.06) 0%, transparent 50%),
-        radial-gradient(ellipse at 50% 80%, rgba(6,182,212,0.05) 0%, transparent 50%);
-    animation: orb1 20s ease-in-out infinite;
-    z-index: 0;
-    pointer-events: none;
-}
-[data-testid="stApp"]::after {
-    content: '';
-    position: fixed;
-    top: -50%;
-    left: -50%;
-    width: 200%;
-    height: 200%;
-    background:
-        radial-gradient(ellipse at 70% 60%, rgba(236,72,153,0.04) 0%, transparent 50%),
-        radial-gradient(ellipse at 30% 30%, rgba(16,185,129,0.04) 0%, transparent 50%);
-    animation: orb2 25s ease-in-out infinite;
-    z-index: 0;
-    pointer-events: none;
-}
-[data-testid="stApp"] > * { position: relative; z-index: 1; }
-
-/* ── Sidebar ── */
-[data-testid="stSidebar"] {
-    background: linear-gradient(180deg, rgba(13,17,23,0.95) 0%, rgba(17,24,39,0.92) 100%) !important;
-    backdrop-filter: blur(24px) saturate(1.3) !important;
-    border-right: 1px solid var(--border-subtle) !important;
-    box-shadow: 4px 0 30px rgba(0,0,0,0.5) !important;
-}
-[data-testid="stSidebar"] .stMarkdown h1,
-[data-testid="stSidebar"] .stMarkdown h2,
-[data-testid="stSidebar"] .stMarkdown h3 {
-    color: var(--text-primary) !important;
-}
-[data-testid="stSidebar"] hr {
-    border-color: rgba(99,102,241,0.15) !important;
-    margin: 0.8rem 0 !important;
-}
 
-/* ── Sidebar logo area ── */
-.sidebar-logo {
-    text-align: center;
-    padding: 0.5rem 0 0.2rem 0;
-}
-.sidebar-logo .logo-icon {
-    font-size: 2.2rem;
-    display: block;
-    margin-bottom: 0.3rem;
-    filter: drop-shadow(0 0 12px rgba(99,102,241,0.5));
-}
-            
-.sidebar-logo .logo-text {
-    font-size: 1.3rem;
-    font-weight: 800;
-    background: var(--gradient-accent);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    letter-spacing: -0.02em;
-}
-.sidebar-logo .logo-sub {
-    font-size: 0.7rem;
-    color: var(--text-muted);
-    letter-spacing: 0.15em;
-    text-transform: uppercase;
-    margin-top: 0.15rem;
-}
+# ---------------------------------------------------------------------------
+# Plotly dark template helper
+# ---------------------------------------------------------------------------
+PLOTLY_LAYOUT = dict(
+    template="plotly_dark",
+    paper_bgcolor="rgba(0,0,0,0)",
+    plot_bgcolor="rgba(13,17,23,0.5)",
+    font=dict(family="Inter, sans-serif", color="#e8edf5", size=12),
+    margin=dict(l=60, r=30, t=55, b=50),
+    legend=dict(bgcolor="rgba(0,0,0,0)", font=dict(size=11)),
+    xaxis=dict(gridcolor="rgba(99,102,241,0.08)", zerolinecolor="rgba(99,102,241,0.15)"),
+    yaxis=dict(gridcolor="rgba(99,102,241,0.08)", zerolinecolor="rgba(99,102,241,0.15)"),
+)
 
-/* ── Main header ── */
-.main-header {
-    background: linear-gradient(135deg, rgba(99,102,241,0.1), rgba(139,92,246,0.07), rgba(6,182,212,0.05));
-    border: 1px solid var(--border-subtle);
-    border-radius: 20px;
-    padding: 2.2rem 2.8rem;
-    margin-bottom: 1.8rem;
-    backdrop-filter: blur(16px);
-    position: relative;
-    overflow: hidden;
-    animation: slideUp 0.6s ease-out;
-}
-.main-header::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 3px;
-    background: var(--gradient-accent);
-    border-radius: 20px 20px 0 0;
-}
-.main-header::after {
-    content: '';
-    position: absolute;
-    top: -50%;
-    right: -20%;
-    width: 300px;
-    height: 300px;
-    background: radial-gradient(circle, rgba(99,102,241,0.08) 0%, transparent 70%);
-    border-radius: 50%;
-    pointer-events: none;
-}
-.main-header h1 {
-    background: var(--gradient-accent);
-    background-size: 200% auto;
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    font-weight: 900;
-    font-size: 2.4rem;
-    margin: 0;
-    letter-spacing: -0.03em;
-    animation: gradientShift 6s ease infinite;
-}
-.main-header p {
-    color: var(--text-secondary);
-    font-size: 1.05rem;
-    margin: 0.5rem 0 0 0;
-    font-weight: 300;
-    line-height: 1.5;
-}
+COLOR_PALETTE = [
+    "#6366f1", "#8b5cf6", "#06b6d4", "#10b981", "#f59e0b",
+    "#ef4444", "#ec4899", "#14b8a6", "#3b82f6", "#a855f7",
+]
 
-/* ── Glass card ── */
-.glass-card {
-    background: var(--bg-card);
-    border: 1px solid var(--border-subtle);
-    border-radius: 16px;
-    padding: 1.6rem 1.8rem;
-    margin-bottom: 1.2rem;
-    backdrop-filter: blur(12px);
-    transition: all 0.35s cubic-bezier(0.4, 0, 0.2, 1);
-    animation: slideUp 0.5s ease-out;
-    position: relative;
-    overflow: hidden;
-}
-.glass-card::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 2px;
-    background: var(--gradient-accent);
-    opacity: 0;
-    transition: opacity 0.35s ease;
-}
-.glass-card:hover {
-    background: var(--bg-card-hover);
-    border-color: var(--border-glow);
-    transform: translateY(-3px);
-    box-shadow: var(--shadow-glow), var(--shadow-md);
-}
-.glass-card:hover::before {
-    opacity: 1;
-}
-.glass-card h3 {
-    color: var(--accent-3) !important;
-    font-size: 1.1rem;
-    font-weight: 700;
-    margin-top: 0;
-    margin-bottom: 0.5rem;
-    letter-spacing: -0.01em;
+# LaTeX impedance expression for each circuit model
+CIRCUIT_EQUATIONS = {
+    1: r"Z = R_1 + \frac{1}{\frac{1}{R_2} + \frac{1}{Z_{Q_1}}}",
+    2: r"Z = R_1 + \frac{1}{\frac{1}{R_2} + \frac{1}{Z_{Q_1}}} + \frac{1}{\frac{1}{R_3} + \frac{1}{Z_{Q_2}}}",
+    3: r"Z = R_1 + \frac{1}{\frac{1}{Z_{Q_1}} + \frac{1}{R_2 + Z_W}}",
+    4: r"Z = R_1 + \frac{1}{\frac{1}{R_2} + \frac{1}{Z_{Q_1}}} + \frac{1}{\frac{1}{Z_{Q_2}} + \frac{1}{R_3 + Z_W}}",
+    5: r"Z = R_1 + \frac{1}{\frac{1}{R_2 + \frac{1}{\frac{1}{R_3+Z_W}+\frac{1}{Z_{Q_2}}}} + \frac{1}{Z_{Q_1}}}",
 }
 
-/* ── Metric cards ── */
-.metric-row {
-    display: flex;
-    gap: 1rem;
-    flex-wrap: wrap;
-    margin-bottom: 1.2rem;
-    animation: slideUp 0.5s ease-out;
-}
-.metric-card {
-    flex: 1;
-    min-width: 140px;
-    background: linear-gradient(145deg, rgba(99,102,241,0.08), rgba(6,182,212,0.04));
-    border: 1px solid rgba(99,102,241,0.15);
-    border-radius: 16px;
-    padding: 1.2rem 1.4rem;
-    text-align: center;
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    position: relative;
-    overflow: hidden;
-}
-.metric-card::after {
-    content: '';
-    position: absolute;
-    inset: 0;
-    background: linear-gradient(135deg, rgba(99,102,241,0.05), transparent);
-    opacity: 0;
-    transition: opacity 0.3s ease;
-}
-.metric-card:hover {
-    transform: translateY(-4px);
-    border-color: rgba(99,102,241,0.35);
-    box-shadow: 0 8px 25px rgba(99,102,241,0.15);
-}
-.metric-card:hover::after { opacity: 1; }
-.metric-card .label {
-    color: var(--text-secondary);
-    font-size: 0.72rem;
-    font-weight: 600;
-    text-transform: uppercase;
-    letter-spacing: 0.1em;
-}
-.metric-card .value {
-    color: var(--text-primary);
-    font-size: 1.6rem;
-    font-weight: 800;
-    margin-top: 0.3rem;
-    font-family: 'JetBrains Mono', monospace;
-}
 
-/* ── Section divider ── */
-.section-divider {
-    height: 1px;
-    background: linear-gradient(90deg, transparent, rgba(99,102,241,0.3), transparent);
-    margin: 2rem 0;
-    border: none;
-}
+@st.cache_data(show_spinner=False)
+def _equation_svg(cid):
+    """Circuit equation rendered once to SVG with mathtext (no client-side TeX)."""
+    return equation_svg(CIRCUIT_EQUATIONS[cid])
 
-/* ── Feature card (landing) ── */
-.feature-card {
-    background: var(--bg-card);
-    border: 1px solid var(--border-subtle);
-    border-radius: 18px;
-    padding: 2rem 1.8rem;
-    text-align: center;
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-    position: relative;
-    overflow: hidden;
-    min-height: 190px;
-}
-.feature-card::before {
-    content: '';
-    position: absolute;
-    top: 0; left: 0; right: 0;
-    height: 3px;
-    transition: opacity 0.3s ease;
-    opacity: 0.6;
-}
-.feature-card.fc-purple::before { background: linear-gradient(90deg, #6366f1, #8b5cf6); }
-.feature-card.fc-cyan::before   { background: linear-gradient(90deg, #06b6d4, #10b981); }
-.feature-card.fc-amber::before  { background: linear-gradient(90deg, #f59e0b, #ef4444); }
-.feature-card.fc-pink::before   { background: linear-gradient(90deg, #ec4899, #8b5cf6); }
-.feature-card.fc-green::before  { background: linear-gradient(90deg, #10b981, #06b6d4); }
-.feature-card:hover {
-    transform: translateY(-6px);
-    border-color: var(--border-glow);
-    box-shadow: var(--shadow-glow), var(--shadow-lg);
-}
-.feature-card:hover::before { opacity: 1; }
-.feature-card .fc-icon {
-    font-size: 2.2rem;
-    display: block;
-    margin-bottom: 0.8rem;
-    animation: float 4s ease-in-out infinite;
-}
-.feature-card .fc-title {
-    font-size: 1rem;
-    font-weight: 700;
-    color: var(--text-primary);
-    margin-bottom: 0.4rem;
-}
-.feature-card .fc-desc {
-    font-size: 0.82rem;
-    color: var(--text-secondary);
-    line-height: 1.5;
-}
-.feature-card .fc-tags {
-    margin-top: 0.8rem;
-    display: flex;
-    flex-wrap: wrap;
-    gap: 0.3rem;
-    justify-content: center;
-}
-.feature-card .fc-tag {
-    font-size: 0.65rem;
-    font-weight: 600;
-    padding: 0.2rem 0.5rem;
-    border-radius: 6px;
-    background: rgba(99,102,241,0.12);
-    color: var(--accent-1);
-    border: 1px solid rgba(99,102,241,0.15);
-}
 
-/* ── Buttons ── */
-.stButton > button {
-    background: var(--gradient-1) !important;
-    background-size: 200% auto !important;
-    color: white !important;
-    border: none !important;
-    border-radius: 12px !important;
-    padding: 0.7rem 2.2rem !important;
-    font-weight: 700 !important;
-    font-size: 0.95rem !important;
-    letter-spacing: 0.01em !important;
-    transition: all 0.35s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    box-shadow: 0 4px 15px rgba(99,102,241,0.25), inset 0 1px 0 rgba(255,255,255,0.1) !important;
-    animation: pulseGlow 3s ease-in-out infinite !important;
-}
-.stButton > button:hover {
-    background-position: right center !important;
-    transform: translateY(-3px) scale(1.02) !important;
-    box-shadow: 0 8px 30px rgba(99,102,241,0.45), inset 0 1px 0 rgba(255,255,255,0.15) !important;
-}
-.stButton > button:active {
-    transform: translateY(-1px) scale(0.98) !important;
-}
+# Total points per overlay subplot; spectra are decimated to fit this budget
+OVERLAY_POINT_BUDGET = 20_000
+# Never decimate an overlay spectrum below this many points
+OVERLAY_MIN_POINTS = 50
 
-/* ── Download buttons ── */
-.stDownloadButton > button {
-    background: linear-gradient(135deg, rgba(16,185,129,0.15), rgba(6,182,212,0.1)) !important;
-    border: 1px solid rgba(16,185,129,0.3) !important;
-    color: #10b981 !important;
-    border-radius: 12px !important;
-    font-weight: 600 !important;
-    transition: all 0.3s ease !important;
-    animation: none !important;
-    box-shadow: none !important;
-}
-.stDownloadButton > button:hover {
-    background: linear-gradient(135deg, rgba(16,185,129,0.25), rgba(6,182,212,0.18)) !important;
-    border-color: rgba(16,185,129,0.5) !important;
-    transform: translateY(-2px) !important;
-    box-shadow: 0 4px 15px rgba(16,185,129,0.2) !important;
-}
+# Plotly config for the display-only feature-importance chart: no hover
+# layer, drag handlers or modebar
+STATIC_PLOT_CONFIG = {"staticPlot": True, "displayModeBar": False}
 
-/* ── Slider ── */
-[data-testid="stSlider"] label { color: var(--text-secondary) !important; }
-[data-testid="stSlider"] [data-testid="stThumbValue"] { font-family: 'JetBrains Mono', monospace !important; font-size: 0.75rem !important; }
-
-/* ── Select / radio ── */
-.stRadio > label, .stSelectbox > label { color: var(--text-secondary) !important; }
-.stRadio [data-testid="stMarkdownContainer"] p { transition: color 0.2s ease;
-            color: white; }
-
-/* ── Tabs ── */
-.stTabs [data-baseweb="tab-list"] { gap: 0.6rem; background: transparent; }
-.stTabs [data-baseweb="tab"] {
-    background: rgba(13,17,23,0.6) !important;
-    border: 1px solid var(--border-subtle) !important;
-    border-radius: 10px !important;
-    color: var(--text-secondary) !important;
-    font-weight: 600 !important;
-    padding: 0.55rem 1.4rem !important;
-    transition: all 0.3s ease !important;
-}
-.stTabs [data-baseweb="tab"]:hover {
-    border-color: var(--border-glow) !important;
-    color: var(--text-primary) !important;
-    background: rgba(99,102,241,0.08) !important;
-}
-.stTabs [aria-selected="true"] {
-    background: var(--gradient-1) !important;
-    color: white !important;
-    border-color: var(--accent-1) !important;
-    box-shadow: 0 4px 15px rgba(99,102,241,0.3) !important;
-}
-.stTabs [data-baseweb="tab-highlight"] { display: none !important; }
-.stTabs [data-baseweb="tab-border"] { display: none !important; }
-
-/* ── File uploader ── */
-[data-testid="stFileUploader"] {
-    border: 2px dashed rgba(99,102,241,0.25) !important;
-    border-radius: 16px !important;
-    padding: 1.3rem !important;
-    transition: all 0.3s ease !important;
-    animation: borderGlow 3s ease-in-out infinite !important;
-}
-[data-testid="stFileUploader"]:hover {
-    border-color: rgba(99,102,241,0.5) !important;
-    background: rgba(99,102,241,0.03) !important;
-}
+# Feature-card styling for the circuit overview grid
+FC_COLORS = ("fc-purple", "fc-cyan", "fc-amber", "fc-pink", "fc-green")
+FC_ICONS = ("🔵", "🟣", "🟠", "🔴", "🟢")
 
-/* ── DataFrames ── */
-[data-testid="stDataFrame"] { border-radius: 12px !important; overflow: hidden !important; }
 
-/* ── Expander ── */
-.streamlit-expanderHeader {
-    color: var(--text-primary) !important;
-    font-weight: 700 !important;
-    border-radius: 12px !important;
-}
+def _nan_join(rows):
+    """Flatten (n, npt) rows into one 1-D array with NaN breaks between rows."""
+    rows = np.atleast_2d(rows)
+    return np.column_stack([rows, np.full(rows.shape[0], np.nan)]).ravel()
 
-/* ── Progress bar ── */
-.stProgress > div > div { background: var(--gradient-1) !important; border-radius: 8px !important; }
 
-/* ── Tooltip + popover ── */
-[data-testid="stTooltipIcon"] { color: var(--accent-1) !important; }
+def _palette_line_traces(x, y, indices, **trace_kwargs):
+    """
+    Build one NaN-separated WebGL line trace per palette colour for the given
+    spectrum indices, instead of one trace per spectrum.
 
-/* ── Success / warning / error ── */
-.stAlert { border-radius: 12px !important; border: none !important; }
+    x may be a shared 1-D axis (e.g. frequency) or an (n, npt) array.
+    """
+    traces = []
+    color_idx = indices % len(COLOR_PALETTE)
+    for c, color in enumerate(COLOR_PALETTE):
+        idx = indices[color_idx == c]
+        if idx.size == 0:
+            continue
+        x_rows = x[idx] if x.ndim == 2 else np.broadcast_to(x, (idx.size, x.size))
+        traces.append(go.Scattergl(
+            x=_nan_join(x_rows), y=_nan_join(y[idx]), mode="lines",
+            line=dict(color=color, width=1), showlegend=False, **trace_kwargs,
+        ))
+    return traces
+
+
+def _stride_indices(n, n_out):
+    """
+    Evenly strided indices of n_out points out of n, always keeping both ends.
+    On the log-spaced frequency grid this is an even decimation in log-space.
+    """
+    if n <= n_out:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, n_out).round().astype(np.intp))
+
+
+def _lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of n_out points of the
+    x-sorted series (x, y) that preserve its visual shape. The first and last
+    points are always kept; each bucket in between contributes the point that
+    spans the largest triangle with the previous pick and the next bucket mean.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_hi = edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[hi:nxt_hi].mean(), y[hi:nxt_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def _feature_grid_html(cards, n_cols):
+    """Build one HTML grid of feature cards, each (color, icon, title, body_html)."""
+    cards_html = "".join(
+        f'<div class="feature-card {color}"><span class="fc-icon">{icon}</span>'
+        f'<div class="fc-title">{title}</div>{body}</div>'
+        for color, icon, title, body in cards
+    )
+    return (
+        f'<div class="feature-grid" style="grid-template-columns:repeat({n_cols}, 1fr);">'
+        f'{cards_html}</div>'
+    )
 
-/* ── Footer ── */
-.app-footer {
-    text-align: center;
-    padding: 1.5rem 0;
-    margin-top: 2rem;
-    border-top: 1px solid rgba(99,102,241,0.1);
-    color: var(--text-muted);
-    font-size: 0.75rem;
-}
-.app-footer a { color: var(--accent-1); text-decoration: none; }
 
-/* ── Hide default Streamlit branding ── */
-#MainMenu {visibility: hidden;}
-footer {visibility: hidden;}
-header {visibility: hidden;}
-</style>
-""", unsafe_allow_html=True)
+# Shared styling for the summary-table rows
+_SUMMARY_ROW_BORDER = ' style="border-bottom:1px solid rgba(99,102,241,0.15);"'
+_SUMMARY_TEXT = "color:#e8edf5;"
 
 
-# ---------------------------------------------------------------------------
-# Plotly dark template helper
-# ---------------------------------------------------------------------------
-PLOTLY_LAYOUT = dict(
-    template="plotly_dark",
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="rgba(13,17,23,0.5)",
-    font=dict(family="Inter, sans-serif", color="#e8edf5", size=12),
-    margin=dict(l=60, r=30, t=55, b=50),
-    legend=dict(bgcolor="rgba(0,0,0,0)", font=dict(size=11)),
-    xaxis=dict(gridcolor="rgba(99,102,241,0.08)", zerolinecolor="rgba(99,102,241,0.15)"),
-    yaxis=dict(gridcolor="rgba(99,102,241,0.08)", zerolinecolor="rgba(99,102,241,0.15)"),
+def _metric_row_html(cards):
+    """One .metric-row of metric cards, each (label, value, value_style)."""
+    return '<div class="metric-row">' + "".join(
+        f'<div class="metric-card"><div class="label">{label}</div>'
+        f'<div class="value" style="{style}">{value}</div></div>'
+        for label, value, style in cards
+    ) + "</div>"
+
+
+def _summary_table_html(rows):
+    """Risk Assessment Summary card; rows are (label, value, value_style)."""
+    last = len(rows) - 1
+    body = "".join(
+        f'<tr{"" if i == last else _SUMMARY_ROW_BORDER}>'
+        f'<td style="padding:0.6rem; color:#94a3b8;">{label}</td>'
+        f'<td style="padding:0.6rem; {style}">{value}</td></tr>'
+        for i, (label, value, style) in enumerate(rows)
+    )
+    return (
+        '<div class="glass-card"><h3>📋 Risk Assessment Summary</h3>'
+        '<table style="width:100%; border-collapse:collapse; margin-top:0.8rem;">'
+        f"{body}</table></div>"
+    )
+
+
+# Risk classification legend shared by the two prediction pages; the markup
+# is static, so it is formatted once at import
+RISK_EMOJI = {"Low": "🟢", "Moderate": "🟡", "Severe": "🔴"}
+RISK_ITEMS = (
+    (RISK_EMOJI["Low"], "Low Risk", "< 0.1 mm/yr", "Minimal corrosion — safe for continued operation", "fc-green"),
+    (RISK_EMOJI["Moderate"], "Moderate Risk", "0.1 – 0.5 mm/yr", "Noticeable corrosion — schedule maintenance", "fc-amber"),
+    (RISK_EMOJI["Severe"], "Severe Risk", "≥ 0.5 mm/yr", "Critical corrosion — immediate action required", "fc-purple"),
+)
+_RISK_CLASSIFICATION_MD = (
+    '<div class="section-divider"></div>\n\n### 🎯 Risk Classification\n\n'
+    + _feature_grid_html([
+        (color, icon, title,
+         f'<div class="fc-desc" style="font-weight:700; margin-bottom:0.3rem;">{threshold}</div>'
+         f'<div class="fc-desc">{desc}</div>')
+        for icon, title, threshold, desc, color in RISK_ITEMS
+    ], n_cols=3)
 )
 
-COLOR_PALETTE = [
-    "#6366f1", "#8b5cf6", "#06b6d4", "#10b981", "#f59e0b",
-    "#ef4444", "#ec4899", "#14b8a6", "#3b82f6", "#a855f7",
-]
+
+# Simulator landing grid of circuit models, also static
+_CIRCUIT_MODELS_MD = (
+    '<div class="section-divider"></div>\n\n### 🏗️ Available Circuit Models\n\n'
+    + _feature_grid_html([
+        (FC_COLORS[i], FC_ICONS[i], info["name"],
+         f'<div class="fc-desc">{info["description"]}</div><div class="fc-tags">'
+         + "".join(f'<span class="fc-tag">{p}</span>' for p in info["params"])
+         + "</div>")
+        for i, info in enumerate(CIRCUIT_INFO.values())
+    ], n_cols=3)
+)
+
+# Model-architecture cards on the training page
+ARCH_ITEMS = (
+    ("🧪", "Conv1D Layers", "5 layers (64→768)", "fc-purple"),
+    ("🧠", "Dense Layers", "4 layers + output", "fc-cyan"),
+    ("⚙️", "Optimizer", "Adam + ReduceLR", "fc-amber"),
+    ("📊", "Loss Function", "Mean Absolute Error", "fc-green"),
+)
+_ARCH_GRID_HTML = _feature_grid_html([
+    (color, icon, title, f'<div class="fc-desc">{desc}</div>')
+    for icon, title, desc, color in ARCH_ITEMS
+], n_cols=4)
+
+
+def _render_risk_classification():
+    """Divider, heading and risk-level cards in a single markdown element."""
+    st.markdown(_RISK_CLASSIFICATION_MD, unsafe_allow_html=True)
 
 
 # ---------------------------------------------------------------------------
@@ -576,10 +315,6 @@ with st.sidebar:
 # PAGE 1: EIS Simulator
 # ═══════════════════════════════════════════════════════════════════════════
 if page == "🔬 EIS Simulator":
-    from utils.eis_simulation import (
-        F_range, sim_circuit, CIRCUIT_INFO, export_data,
-    )
-
     # Header
     st.markdown("""
     <div class="main-header">
@@ -601,6 +336,10 @@ if page == "🔬 EIS Simulator":
 
         size_number = st.slider("Number of Spectra", 1, 512, 10, step=1)
         number_of_point = st.slider("Points per Spectrum", 20, 200, 100, step=10)
+        seed = st.number_input(
+            "Random Seed", min_value=0, value=42, step=1,
+            help="Same seed and settings always give the same spectra",
+        )
 
         st.markdown("#### 📡 Frequency Range (Hz)")
         col_f1, col_f2 = st.columns(2)
@@ -624,34 +363,125 @@ if page == "🔬 EIS Simulator":
 
         generate_btn = st.button("⚡ Generate Spectra", use_container_width=True)
 
+    # Memoised simulation (ranges passed as tuples so they hash)
+    @st.cache_data(max_entries=16, show_spinner=False)
+    def _simulate(circuit_id, size_number, number_of_point, freq_min, freq_max,
+                  resistance_range, alpha_range, q_range, sigma_range, seed):
+        angular_frequency, frequency_Hz = F_range(freq_min, freq_max, number_of_point)
+        Zsum, Zparam = sim_circuit(
+            circuit_id, size_number, number_of_point,
+            angular_frequency, list(resistance_range),
+            list(alpha_range), list(q_range), list(sigma_range),
+            seed=seed,
+        )
+        # Plot arrays are derived here so highlight-slider reruns reuse them
+        Zreal, negimag, phase, mag = impedance_planes(Zsum)
+        # Equal-span Nyquist axis ranges over every spectrum, so the client
+        # never has to autorange the scale-anchored axes
+        x0, y0 = float(Zreal.min()), float(negimag.min())
+        span = 1.05 * max(float(Zreal.max()) - x0, float(negimag.max()) - y0, 1e-12)
+        pad = 0.025 * span
+        nyquist_ranges = ([x0 - pad, x0 - pad + span], [y0 - pad, y0 - pad + span])
+        return (Zreal, negimag, Zparam, angular_frequency, frequency_Hz, phase, mag,
+                nyquist_ranges)
+
+    @st.cache_data(show_spinner=False)
+    def _params_df(Zparam, cid):
+        df = pd.DataFrame(np.ascontiguousarray(Zparam), columns=CIRCUIT_INFO[cid]["params"])
+        df.index = [f"Spectrum {i+1}" for i in range(len(df))]
+        return df
+
+    # Same text as df.to_csv(index=True), written straight from the float rows
+    # (repr is what pandas emits) instead of through the pandas CSV writer
+    @st.cache_data(show_spinner=False)
+    def _params_csv(Zparam, cid):
+        header = "," + ",".join(CIRCUIT_INFO[cid]["params"]) + "\n"
+        return header + "".join(
+            f"Spectrum {i + 1}," + ",".join(map(repr, row)) + "\n"
+            for i, row in enumerate(Zparam.tolist())
+        )
+
+    # The overlay doesn't depend on the highlight slider, so build it once per
+    # simulation (keyed on its inputs; the result dict stays out of the hash)
+    @st.cache_resource(max_entries=4, show_spinner=False)
+    def _build_overlay_fig(sim_key, _res):
+        npt, sz = _res["number_of_point"], _res["size_number"]
+        frequency = _res["frequency"]
+        fig = make_subplots(rows=1, cols=3, subplot_titles=("Nyquist", "Phase", "|Z|"))
+        overlay_idx = np.arange(sz)
+        # Decimate every spectrum so the whole overlay stays within budget
+        pts = _stride_indices(npt, max(OVERLAY_MIN_POINTS, OVERLAY_POINT_BUDGET // sz))
+        for col, (x_vals, y_vals) in enumerate(
+            [(_res["Zreal"][:, pts], _res["negimag"][:, pts]),
+             (frequency[pts], _res["phase"][:, pts]),
+             (frequency[pts], _res["mag"][:, pts])], start=1,
+        ):
+            fig.add_traces(
+                _palette_line_traces(x_vals, y_vals, overlay_idx, opacity=0.6), rows=1, cols=col,
+            )
+        fig.update_xaxes(title_text="Z' (Ω)", row=1, col=1)
+        fig.update_yaxes(title_text="−Z'' (Ω)", row=1, col=1)
+        fig.update_xaxes(type="log", title_text="Freq (Hz)", row=1, col=2)
+        fig.update_yaxes(title_text="Phase (°)", row=1, col=2)
+        fig.update_xaxes(type="log", title_text="Freq (Hz)", row=1, col=3)
+        fig.update_yaxes(title_text="|Z| (Ω)", row=1, col=3)
+        fig.update_layout(**PLOTLY_LAYOUT, height=450, uirevision=f"overlay-{hash(sim_key)}")
+        return fig
+
+    # Keyed on the simulation inputs only; the arrays are derived from them
+    @st.cache_data(max_entries=4, show_spinner=False)
+    def _mat_bytes(sim_key, _negimag, _phase, _mag, _Zparam):
+        buf = io.BytesIO()
+        # Build x_data: (size_number, 3, number_of_point) from Zsum,
+        # filled in place rather than via np.stack
+        x_data = np.empty((_negimag.shape[0], 3, _negimag.shape[1]), dtype=_mag.dtype)
+        np.negative(_negimag, out=x_data[:, 0])
+        x_data[:, 1] = _phase
+        x_data[:, 2] = _mag
+        # y_data: actual circuit parameters (sz, n_params)
+        save_mat_arrays(buf, {"x_data": x_data, "y_data": _Zparam})
+        return buf.getvalue()
+
     # ── Main content ──
-    if generate_btn:
+    # Skip the simulation entirely when Generate is clicked with unchanged inputs
+    sim_params = (
+        circuit_id, size_number, number_of_point, freq_min, freq_max,
+        tuple(r_exp), tuple(alpha_range), tuple(q_exp), tuple(sigma_exp), seed,
+    )
+    if generate_btn and st.session_state.get("sim_params") != sim_params:
         with st.spinner("Simulating impedance spectra…"):
-            angular_frequency, frequency_Hz = F_range(freq_min, freq_max, number_of_point)
-            Zsum, Zparam = sim_circuit(
-                circuit_id, size_number, number_of_point,
-                angular_frequency, resistance_range,
-                list(alpha_range), q_range, sigma_range,
+            (Zreal, negimag, Zparam, angular_frequency, frequency_Hz, phase, mag,
+             nyquist_ranges) = _simulate(
+                circuit_id, size_number, number_of_point, freq_min, freq_max,
+                tuple(resistance_range), tuple(alpha_range),
+                tuple(q_range), tuple(sigma_range), int(seed),
             )
 
         st.session_state["sim_result"] = {
-            "Zsum": Zsum, "Zparam": Zparam,
+            "Zreal": Zreal, "negimag": negimag, "Zparam": Zparam,
+            "phase": phase, "mag": mag, "nyquist_ranges": nyquist_ranges,
             "frequency": frequency_Hz,
             "angular_frequency": angular_frequency,
             "circuit_id": circuit_id,
             "size_number": size_number,
             "number_of_point": number_of_point,
         }
+        st.session_state["sim_params"] = sim_params
 
     if "sim_result" in st.session_state:
         res = st.session_state["sim_result"]
-        Zsum = res["Zsum"]
         Zparam = res["Zparam"]
         frequency = res["frequency"]
         cid = res["circuit_id"]
         sz = res["size_number"]
         npt = res["number_of_point"]
 
+        # Per-spectrum plot arrays, all derived once in _simulate
+        Zreal = res["Zreal"]
+        negimag_all = res["negimag"]
+        phase_all = res["phase"]
+        mag_all = res["mag"]
+
         # Metrics row
         st.markdown(f"""
         <div class="metric-row">
@@ -674,16 +504,12 @@ if page == "🔬 EIS Simulator":
         </div>
         """, unsafe_allow_html=True)
 
-        # Circuit equations
-        equations = {
-            1: r"Z = R_1 + \frac{1}{\frac{1}{R_2} + \frac{1}{Z_{Q_1}}}",
-            2: r"Z = R_1 + \frac{1}{\frac{1}{R_2} + \frac{1}{Z_{Q_1}}} + \frac{1}{\frac{1}{R_3} + \frac{1}{Z_{Q_2}}}",
-            3: r"Z = R_1 + \frac{1}{\frac{1}{Z_{Q_1}} + \frac{1}{R_2 + Z_W}}",
-            4: r"Z = R_1 + \frac{1}{\frac{1}{R_2} + \frac{1}{Z_{Q_1}}} + \frac{1}{\frac{1}{Z_{Q_2}} + \frac{1}{R_3 + Z_W}}",
-            5: r"Z = R_1 + \frac{1}{\frac{1}{R_2 + \frac{1}{\frac{1}{R_3+Z_W}+\frac{1}{Z_{Q_2}}}} + \frac{1}{Z_{Q_1}}}",
-        }
+        # Circuit equation
         with st.expander("📐 Circuit Equation", expanded=True):
-            st.latex(equations[cid])
+            if MATHTEXT_AVAILABLE:
+                st.image(_equation_svg(cid))
+            else:
+                st.latex(CIRCUIT_EQUATIONS[cid])
 
         # Plots
         spectrum_idx = st.slider(
@@ -692,109 +518,92 @@ if page == "🔬 EIS Simulator":
             help="Choose which spectrum to show in bold; all others shown semi-transparent",
         )
 
+        # Constant per simulation: highlight-slider reruns keep zoom/pan and
+        # let Plotly.js diff the data instead of relaying out
+        ui_rev = hash(st.session_state["sim_params"])
+
         tab_nyquist, tab_bode, tab_overlay = st.tabs(["Nyquist Plot", "Bode Plots", "All Spectra Overlay"])
 
         with tab_nyquist:
             fig = go.Figure()
-            for i in range(sz):
-                opacity = 1.0 if i == spectrum_idx else 0.15
-                width = 2.5 if i == spectrum_idx else 1
-                fig.add_trace(go.Scatter(
-                    x=Zsum[i].real, y=-Zsum[i].imag,
-                    mode="lines", name=f"Spectrum {i+1}",
-                    line=dict(color=COLOR_PALETTE[i % len(COLOR_PALETTE)], width=width),
-                    opacity=opacity,
-                    showlegend=(i == spectrum_idx),
-                ))
+            # Dimmed background spectra, decimated to at most 50 (ceil-divided
+            # stride) and batched into one trace per colour
+            bg_idx = np.arange(0, sz, max(1, -(-sz // 50)))
+            bg_idx = bg_idx[bg_idx != spectrum_idx]
+            fig.add_traces(_palette_line_traces(Zreal, negimag_all, bg_idx, opacity=0.15) + [
+                go.Scattergl(
+                    x=Zreal[spectrum_idx], y=negimag_all[spectrum_idx],
+                    mode="lines", name=f"Spectrum {spectrum_idx+1}",
+                    line=dict(color=COLOR_PALETTE[spectrum_idx % len(COLOR_PALETTE)], width=2.5),
+                ),
+            ])
             fig.update_layout(
                 **PLOTLY_LAYOUT,
                 title="Nyquist Plot  (Z' vs −Z'')",
                 xaxis_title="Z' (Ω)",
                 yaxis_title="−Z'' (Ω)",
                 height=500,
+                uirevision=f"nyquist-{ui_rev}",
             )
-            fig.update_yaxes(scaleanchor="x", scaleratio=1)
-            st.plotly_chart(fig, use_container_width=True)
+            x_range, y_range = res["nyquist_ranges"]
+            fig.update_xaxes(range=x_range)
+            fig.update_yaxes(range=y_range, scaleanchor="x", scaleratio=1)
+            if bg_idx.size < sz - 1:
+                st.caption(f"Background: {bg_idx.size} of {sz} spectra shown at low opacity")
+            st.plotly_chart(fig, use_container_width=True, key="sim_nyquist")
 
         with tab_bode:
-            phase = np.degrees(np.arctan2(Zsum[spectrum_idx].imag, Zsum[spectrum_idx].real))
-            mag = np.absolute(Zsum[spectrum_idx])
-
             fig = make_subplots(rows=1, cols=2, subplot_titles=("Phase vs Frequency", "|Z| vs Frequency"))
-            fig.add_trace(go.Scatter(
-                x=frequency, y=phase, mode="lines",
+            fig.add_trace(go.Scattergl(
+                x=frequency, y=phase_all[spectrum_idx], mode="lines",
                 line=dict(color="#8b5cf6", width=2),
             ), row=1, col=1)
-            fig.add_trace(go.Scatter(
-                x=frequency, y=mag, mode="lines",
+            fig.add_trace(go.Scattergl(
+                x=frequency, y=mag_all[spectrum_idx], mode="lines",
                 line=dict(color="#06b6d4", width=2),
             ), row=1, col=2)
             fig.update_xaxes(type="log", title_text="Frequency (Hz)", row=1, col=1)
             fig.update_xaxes(type="log", title_text="Frequency (Hz)", row=1, col=2)
             fig.update_yaxes(title_text="Phase (°)", row=1, col=1)
             fig.update_yaxes(title_text="|Z| (Ω)", row=1, col=2)
-            fig.update_layout(**PLOTLY_LAYOUT, height=420, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            fig.update_layout(
+                **PLOTLY_LAYOUT, height=420, showlegend=False, uirevision=f"bode-{ui_rev}",
+            )
+            st.plotly_chart(fig, use_container_width=True, key="sim_bode")
 
         with tab_overlay:
-            fig = make_subplots(rows=1, cols=3, subplot_titles=("Nyquist", "Phase", "|Z|"))
-            for i in range(min(sz, 50)):
-                color = COLOR_PALETTE[i % len(COLOR_PALETTE)]
-                fig.add_trace(go.Scatter(
-                    x=Zsum[i].real, y=-Zsum[i].imag, mode="lines",
-                    line=dict(color=color, width=1), opacity=0.6, showlegend=False,
-                ), row=1, col=1)
-                ph = np.degrees(np.arctan2(Zsum[i].imag, Zsum[i].real))
-                mg = np.absolute(Zsum[i])
-                fig.add_trace(go.Scatter(
-                    x=frequency, y=ph, mode="lines",
-                    line=dict(color=color, width=1), opacity=0.6, showlegend=False,
-                ), row=1, col=2)
-                fig.add_trace(go.Scatter(
-                    x=frequency, y=mg, mode="lines",
-                    line=dict(color=color, width=1), opacity=0.6, showlegend=False,
-                ), row=1, col=3)
-            fig.update_xaxes(title_text="Z' (Ω)", row=1, col=1)
-            fig.update_yaxes(title_text="−Z'' (Ω)", row=1, col=1)
-            fig.update_xaxes(type="log", title_text="Freq (Hz)", row=1, col=2)
-            fig.update_yaxes(title_text="Phase (°)", row=1, col=2)
-            fig.update_xaxes(type="log", title_text="Freq (Hz)", row=1, col=3)
-            fig.update_yaxes(title_text="|Z| (Ω)", row=1, col=3)
-            fig.update_layout(**PLOTLY_LAYOUT, height=450)
-            if sz > 50:
-                st.info(f"Showing first 50 of {sz} spectra for performance.")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(
+                _build_overlay_fig(st.session_state["sim_params"], res),
+                use_container_width=True, key="sim_overlay",
+            )
 
         # Parameters table
         st.markdown('<div class="glass-card"><h3>📋 Generated Parameters</h3></div>', unsafe_allow_html=True)
-        param_names = CIRCUIT_INFO[cid]["params"]
-        df_params = pd.DataFrame(Zparam, columns=param_names)
-        df_params.index = [f"Spectrum {i+1}" for i in range(len(df_params))]
-        st.dataframe(df_params.style.format("{:.4g}"), use_container_width=True, height=300)
+        df_params = _params_df(Zparam, cid)
+        st.dataframe(
+            df_params,
+            column_config={
+                c: st.column_config.NumberColumn(format="%.4g") for c in df_params.columns
+            },
+            use_container_width=True,
+            height=300,
+        )
 
         # Download buttons
         col_dl1, col_dl2 = st.columns(2)
         with col_dl1:
             # .mat download — save spectra features + circuit parameters
-            buf = io.BytesIO()
-            # Build x_data: (size_number, 3, number_of_point) from Zsum
-            imge = Zsum.imag
-            phase = np.degrees(np.arctan2(Zsum.imag, Zsum.real))
-            mag = np.absolute(Zsum)
-            x_data = np.stack([imge, phase, mag], axis=1)  # (sz, 3, npt)
-            # y_data: actual circuit parameters (sz, n_params)
-            y_data = Zparam
-            mdic = {"x_data": x_data, "y_data": y_data}
-            scipy.io.savemat(buf, mdic)
             st.download_button(
                 "📥 Download .mat",
-                data=buf.getvalue(),
+                data=_mat_bytes(
+                    st.session_state["sim_params"], negimag_all, phase_all, mag_all, Zparam,
+                ),
                 file_name=f"eis_circuit{cid}_{sz}spectra.mat",
                 mime="application/octet-stream",
                 use_container_width=True,
             )
         with col_dl2:
-            csv_buf = df_params.to_csv(index=True)
+            csv_buf = _params_csv(Zparam, cid)
             st.download_button(
                 "📥 Download Parameters CSV",
                 data=csv_buf,
@@ -812,22 +621,7 @@ if page == "🔬 EIS Simulator":
         """, unsafe_allow_html=True)
 
         # Show available circuits with feature cards
-        st.markdown("<div class='section-divider'></div>", unsafe_allow_html=True)
-        st.markdown("### 🏗️ Available Circuit Models")
-        fc_colors = ["fc-purple", "fc-cyan", "fc-amber", "fc-pink", "fc-green"]
-        fc_icons = ["🔵", "🟣", "🟠", "🔴", "🟢"]
-        cols = st.columns(3)
-        for i, (cid_val, info) in enumerate(CIRCUIT_INFO.items()):
-            with cols[i % 3]:
-                tags_html = ''.join(f'<span class="fc-tag">{p}</span>' for p in info['params'])
-                st.markdown(f"""
-                <div class="feature-card {fc_colors[i]}">
-                    <span class="fc-icon">{fc_icons[i]}</span>
-                    <div class="fc-title">{info['name']}</div>
-                    <div class="fc-desc">{info['description']}</div>
-                    <div class="fc-tags">{tags_html}</div>
-                </div>
-                """, unsafe_allow_html=True)
+        st.markdown(_CIRCUIT_MODELS_MD, unsafe_allow_html=True)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -852,6 +646,14 @@ elif page == "🧠 Model Training":
             format_func=lambda x: f"{x:.4f}",
         )
         test_size = st.slider("Validation Split", 0.1, 0.4, 0.2, step=0.05)
+        _gpu_ok = gpu_available()
+        use_gpu = st.checkbox(
+            "Use GPU",
+            value=False,
+            disabled=not _gpu_ok,
+            help="Train XGBoost on a CUDA device" if _gpu_ok
+            else "Requires XGBoost with CUDA support, CuPy and a visible GPU",
+        )
 
     # Upload training data
     uploaded_file = st.file_uploader(
@@ -882,29 +684,33 @@ elif page == "🧠 Model Training":
             </div>
             """, unsafe_allow_html=True)
 
-    if st.button("🚀 Start Training", use_container_width=True):
+    # Parsed dataset cached per upload; file_id changes whenever a new file is
+    # uploaded, and the leading underscore keeps the file itself out of the key
+    @st.cache_data(show_spinner=False, max_entries=4)
+    def _load_training_data(file_id, test_size, _uploaded_file):
+        # Save uploaded file temporarily, copying in bounded chunks
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".mat") as tmp:
+            _uploaded_file.seek(0)
+            shutil.copyfileobj(_uploaded_file, tmp, length=1 << 16)
+            tmp_path = tmp.name
         try:
-            from utils.ml_model import load_and_preprocess_data
-            from sklearn.ensemble import GradientBoostingRegressor
-            from sklearn.multioutput import MultiOutputRegressor
-            from sklearn.metrics import mean_absolute_error
-            import joblib
-
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mat") as tmp:
-                tmp.write(uploaded_file.getvalue())
-                tmp_path = tmp.name
+            return load_and_preprocess_data(tmp_path, test_size=test_size)
+        finally:
+            os.unlink(tmp_path)
 
+    if st.button("🚀 Start Training", use_container_width=True):
+        try:
             with st.spinner("Loading and preprocessing data…"):
-                x_train, x_test, y_train, y_test = load_and_preprocess_data(
-                    tmp_path, test_size=test_size
+                x_train, x_test, y_train, y_test = _load_training_data(
+                    uploaded_file.file_id, test_size, uploaded_file,
                 )
-                os.unlink(tmp_path)
 
             # Flatten input if needed
             if len(x_train.shape) > 2:
                 x_train = x_train.reshape(x_train.shape[0], -1)
                 x_test = x_test.reshape(x_test.shape[0], -1)
+            x_train = np.ascontiguousarray(x_train, dtype=np.float32)
+            x_test = np.ascontiguousarray(x_test, dtype=np.float32)
 
             st.markdown(f"""
             <div class="metric-row">
@@ -917,37 +723,56 @@ elif page == "🧠 Model Training":
 
             with st.spinner("Training Gradient Boosting model…"):
 
-                base_model = GradientBoostingRegressor(
-                    n_estimators=300,
-                    learning_rate=0.05,
-                    max_depth=4,
-                    random_state=42
-                )
-
-                model = MultiOutputRegressor(base_model)
-                model.fit(x_train, y_train)
-
-            # Predictions
-            y_train_pred = model.predict(x_train)
-            y_test_pred = model.predict(x_test)
+                # One worker per output column (on GPU the outputs are fitted
+                # in turn on the single device). The cores are split between
+                # the workers: XGBoost / LightGBM get the per-worker thread
+                # count as their explicit n_jobs, and inner_max_num_threads
+                # caps the OpenMP pool of HistGradientBoosting inside each
+                # worker. OpenMP start-up outweighs the gain on small
+                # matrices, so there every booster runs single-threaded.
+                n_outputs = y_train.shape[1] if y_train.ndim > 1 else 1
+                n_cpu = os.cpu_count() or 1
+                n_workers = 1 if use_gpu else min(n_outputs, n_cpu)
+                small_data = x_train.shape[0] * x_train.shape[1] < 1_000_000
+                n_threads = 1 if small_data else max(1, n_cpu // n_workers)
+
+                # Histogram-based boosting (XGBoost when installed): features
+                # are binned once, then split search runs over bins
+                base_model = make_boosting_regressor(use_gpu=use_gpu, n_jobs=n_threads)
+
+                # loky also memory-maps the training matrix (anything over
+                # 1 MB) so workers share one read-only copy instead of
+                # unpickling their own. threadpool_limits covers the
+                # single-worker case, where fitting runs in this process.
+                model = MultiOutputRegressor(base_model, n_jobs=n_workers)
+                with parallel_config(backend="loky", inner_max_num_threads=n_threads), \
+                        threadpool_limits(limits=n_threads):
+                    model.fit(x_train, y_train)
+
+            # Predictions — train MAE is estimated on a 10% subsample so the
+            # full training matrix is not pushed through every tree again
+            train_sub = np.random.default_rng(42).choice(
+                len(x_train), size=max(1, len(x_train) // 10), replace=False,
+            )
+            # One predict over both sets: MultiOutputRegressor dispatches to
+            # its per-output estimators once instead of twice
+            y_all_pred = model.predict(np.vstack([x_train[train_sub], x_test]))
+            y_train_pred, y_test_pred = np.split(y_all_pred, [len(train_sub)])
 
-            train_mae = mean_absolute_error(y_train, y_train_pred)
+            train_mae = mean_absolute_error(y_train[train_sub], y_train_pred)
             val_mae = mean_absolute_error(y_test, y_test_pred)
 
             st.success(
                 f"✅ Training Complete! — Train MAE: {train_mae:.4f} | Val MAE: {val_mae:.4f}"
             )
 
-            # Save model
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pkl") as tmp_model:
-                joblib.dump(model, tmp_model.name)
-                with open(tmp_model.name, "rb") as f:
-                    model_bytes = f.read()
-                os.unlink(tmp_model.name)
+            # Save model straight to memory (no temp-file round-trip)
+            model_buf = io.BytesIO()
+            joblib.dump(model, model_buf, compress=MODEL_COMPRESSION)
 
             st.download_button(
                 "📥 Download Trained Model (.pkl)",
-                data=model_bytes,
+                data=model_buf.getvalue(),
                 file_name="eis_gradient_boost_model.pkl",
                 mime="application/octet-stream",
                 use_container_width=True,
@@ -968,38 +793,13 @@ elif page == "🧠 Model Training":
         # Architecture info cards
         st.markdown("<div class='section-divider'></div>", unsafe_allow_html=True)
         st.markdown("### 🏗️ Model Architecture")
-        arch_cols = st.columns(4)
-        arch_items = [
-            ("🧪", "Conv1D Layers", "5 layers (64→768)", "fc-purple"),
-            ("🧠", "Dense Layers", "4 layers + output", "fc-cyan"),
-            ("⚙️", "Optimizer", "Adam + ReduceLR", "fc-amber"),
-            ("📊", "Loss Function", "Mean Absolute Error", "fc-green"),
-        ]
-        for col, (icon, title, desc, color) in zip(arch_cols, arch_items):
-            with col:
-                st.markdown(f"""
-                <div class="feature-card {color}">
-                    <span class="fc-icon">{icon}</span>
-                    <div class="fc-title">{title}</div>
-                    <div class="fc-desc">{desc}</div>
-                </div>
-                """, unsafe_allow_html=True)
+        st.markdown(_ARCH_GRID_HTML, unsafe_allow_html=True)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # PAGE 3: EIS Spectrum Prediction
 # ═══════════════════════════════════════════════════════════════════════════
 elif page == "📉 EIS Spectrum Prediction":
-    from utils.corrosion_predictor import (
-        load_model as cp_load_model,
-        load_spectrum,
-        load_mat_spectrum,
-        build_feature_vector,
-        predict_corrosion,
-        classify_risk,
-        create_gauge_chart,
-    )
-
     # Header
     st.markdown("""
     <div class="main-header">
@@ -1027,36 +827,47 @@ elif page == "📉 EIS Spectrum Prediction":
             key="eis_model_upload",
         )
     with col_up2:
-        spectrum_file = st.file_uploader(
+        spectrum_files = st.file_uploader(
             "📂 Upload EIS spectrum (.mat or .csv)",
             type=["mat", "csv"],
-            help="Upload a .mat file (same format as training) or a CSV with EIS impedance data",
+            accept_multiple_files=True,
+            help="Upload a .mat file (same format as training) or a CSV with EIS impedance data. "
+                 "Upload several spectra to predict them as one batch.",
             key="eis_spectrum_upload",
         )
 
+    # Keep the unpickled model pinned across reruns for the same upload; keyed
+    # on file_id so the pickle is neither copied out nor hashed on every rerun
+    @st.cache_resource(show_spinner=False, max_entries=4)
+    def _get_uploaded_model(file_id, _model_file):
+        _model_file.seek(0)
+        return cp_load_model(_model_file)
+
     # Predict button
     if st.button("⚡ Predict Corrosion Rate", use_container_width=True, key="eis_predict"):
         if model_file is None:
             st.error("❌ Please upload a trained model (.pkl) file.")
-        elif spectrum_file is None:
+        elif not spectrum_files:
             st.error("❌ Please upload an EIS spectrum (.mat or .csv) file.")
         else:
             try:
                 with st.spinner("Loading model…"):
-                    model = cp_load_model(model_file)
+                    model = _get_uploaded_model(model_file.file_id, model_file)
 
                 with st.spinner("Processing spectrum…"):
-                    file_name = spectrum_file.name.lower()
-                    if file_name.endswith(".mat"):
-                        spectrum = load_mat_spectrum(spectrum_file)
-                    else:
-                        spectrum = load_spectrum(spectrum_file)
+                    spectra = []
+                    for spectrum_file in spectrum_files:
+                        if spectrum_file.name.lower().endswith(".mat"):
+                            spectra.append(load_mat_spectrum(spectrum_file))
+                        else:
+                            spectra.append(load_spectrum(spectrum_file))
 
                 with st.spinner("Building features & predicting…"):
                     # Use default environmental values as placeholders
                     # (Models trained on spectrum+env might need them, but user requested removal from UI)
-                    features = build_feature_vector(
-                        spectrum=spectrum,
+                    # All spectra share the env values, so the whole batch goes through one predict call
+                    features = build_feature_matrix(
+                        spectra,
                         material="Carbon Steel",
                         temperature=25.0,
                         pressure=1.0,
@@ -1065,54 +876,81 @@ elif page == "📉 EIS Spectrum Prediction":
                         flow_velocity=0.0,
                         service_years=0,
                     )
-                    corrosion_rate = predict_corrosion(model, features)
+                    corrosion_rates = predict_corrosion_batch(model, features)
+                    corrosion_rate = float(corrosion_rates[0])
                     risk_label, risk_color, risk_bg, risk_border = classify_risk(corrosion_rate)
 
-                # Results
-                st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-                st.markdown(f"""
-                <div class="metric-row">
-                    <div class="metric-card" style="flex:2;">
-                        <div class="label">Predicted Corrosion Rate</div>
-                        <div class="value" style="font-size:2rem; color:{risk_color};">
-                            {corrosion_rate:.4f} <span style="font-size:0.9rem;">mm/yr</span>
+                if len(spectra) > 1:
+                    # Batch results
+                    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+                    st.markdown(f"""
+                    <div class="metric-row">
+                        <div class="metric-card">
+                            <div class="label">Spectra</div>
+                            <div class="value">{len(spectra)}</div>
                         </div>
-                    </div>
-                    <div class="metric-card" style="flex:1; border-color:{risk_border}; background:{risk_bg};">
-                        <div class="label">Risk Level</div>
-                        <div class="value" style="font-size:1.8rem; color:{risk_color};">
-                            {"🟢" if risk_label == "Low" else "🟡" if risk_label == "Moderate" else "🔴"} {risk_label}
+                        <div class="metric-card">
+                            <div class="label">Mean Rate (mm/yr)</div>
+                            <div class="value">{corrosion_rates.mean():.4f}</div>
+                        </div>
+                        <div class="metric-card">
+                            <div class="label">Max Rate (mm/yr)</div>
+                            <div class="value">{corrosion_rates.max():.4f}</div>
+                        </div>
+                        <div class="metric-card">
+                            <div class="label">Features Used</div>
+                            <div class="value">{features['full'].shape[1]}</div>
                         </div>
                     </div>
-                    <div class="metric-card">
-                        <div class="label">Features Used</div>
-                        <div class="value">{features['full'].shape[1]}</div>
+                    """, unsafe_allow_html=True)
+
+                    batch_df = pd.DataFrame({
+                        "File": [f.name for f in spectrum_files],
+                        "Corrosion Rate (mm/yr)": corrosion_rates,
+                        "Risk Level": classify_risk_batch(corrosion_rates),
+                    })
+                    st.dataframe(
+                        batch_df,
+                        column_config={
+                            "Corrosion Rate (mm/yr)": st.column_config.NumberColumn(format="%.4f"),
+                        },
+                        hide_index=True,
+                        use_container_width=True,
+                    )
+                else:
+                    # Results
+                    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+                    st.markdown(f"""
+                    <div class="metric-row">
+                        <div class="metric-card" style="flex:2;">
+                            <div class="label">Predicted Corrosion Rate</div>
+                            <div class="value" style="font-size:2rem; color:{risk_color};">
+                                {corrosion_rate:.4f} <span style="font-size:0.9rem;">mm/yr</span>
+                            </div>
+                        </div>
+                        <div class="metric-card" style="flex:1; border-color:{risk_border}; background:{risk_bg};">
+                            <div class="label">Risk Level</div>
+                            <div class="value" style="font-size:1.8rem; color:{risk_color};">
+                                {RISK_EMOJI[risk_label]} {risk_label}
+                            </div>
+                        </div>
+                        <div class="metric-card">
+                            <div class="label">Features Used</div>
+                            <div class="value">{features['full'].shape[1]}</div>
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
 
-                # Gauge chart
-                st.markdown('<div class="glass-card"><h3>📊 Corrosion Gauge</h3></div>',
-                            unsafe_allow_html=True)
-                gauge_fig = create_gauge_chart(corrosion_rate, risk_label, risk_color)
-                st.plotly_chart(gauge_fig, use_container_width=True)
+                    # Gauge chart
+                    st.markdown('<div class="glass-card"><h3>📊 Corrosion Gauge</h3></div>',
+                                unsafe_allow_html=True)
+                    st.html(create_gauge_svg(corrosion_rate, risk_label, risk_color))
 
-                # Risk summary table (Simplified)
-                st.markdown(f"""
-                <div class="glass-card">
-                    <h3>📋 Risk Assessment Summary</h3>
-                    <table style="width:100%; border-collapse:collapse; margin-top:0.8rem;">
-                        <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                            <td style="padding:0.6rem; color:#94a3b8;">Risk Level</td>
-                            <td style="padding:0.6rem; font-weight:700; color:{risk_color};">{risk_label}</td>
-                        </tr>
-                        <tr>
-                            <td style="padding:0.6rem; color:#94a3b8;">Corrosion Rate</td>
-                            <td style="padding:0.6rem; color:#e8edf5;">{corrosion_rate:.4f} mm/yr</td>
-                        </tr>
-                    </table>
-                </div>
-                """, unsafe_allow_html=True)
+                    # Risk summary table (Simplified)
+                    st.html(_summary_table_html((
+                        ("Risk Level", risk_label, f"font-weight:700; color:{risk_color};"),
+                        ("Corrosion Rate", f"{corrosion_rate:.4f} mm/yr", _SUMMARY_TEXT),
+                    )))
 
             except ValueError as ve:
                 st.error(f"❌ Validation Error: {ve}")
@@ -1129,38 +967,12 @@ elif page == "📉 EIS Spectrum Prediction":
         </div>
         """, unsafe_allow_html=True)
 
-        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-        st.markdown("### 🎯 Risk Classification")
-        risk_cols = st.columns(3)
-        risk_items = [
-            ("🟢", "Low Risk", "< 0.1 mm/yr", "Minimal corrosion — safe for continued operation", "fc-green"),
-            ("🟡", "Moderate Risk", "0.1 – 0.5 mm/yr", "Noticeable corrosion — schedule maintenance", "fc-amber"),
-            ("🔴", "Severe Risk", "≥ 0.5 mm/yr", "Critical corrosion — immediate action required", "fc-purple"),
-        ]
-        for col, (icon, title, threshold, desc, color) in zip(risk_cols, risk_items):
-            with col:
-                st.markdown(f"""
-                <div class="feature-card {color}">
-                    <span class="fc-icon">{icon}</span>
-                    <div class="fc-title">{title}</div>
-                    <div class="fc-desc" style="font-weight:700; margin-bottom:0.3rem;">{threshold}</div>
-                    <div class="fc-desc">{desc}</div>
-                </div>
-                """, unsafe_allow_html=True)
+        _render_risk_classification()
 
 
 
 
 elif page == "🌡️ Environmental Prediction":
-    from utils.corrosion_predictor import (
-        classify_risk,
-        create_gauge_chart,
-        get_env_ranges,
-        MATERIAL_TYPES,
-        train_env_model,
-        predict_from_env,
-    )
-
     # Header
     st.markdown("""
     <div class="main-header">
@@ -1171,68 +983,88 @@ elif page == "🌡️ Environmental Prediction":
 
     # Load environment ranges
     _csv_path = os.path.join(os.path.dirname(__file__), "data", "corrosion_pipeline_data.csv")
-    env_ranges = get_env_ranges(_csv_path)
+    _csv_mtime = os.path.getmtime(_csv_path) if os.path.exists(_csv_path) else None
+
+    # Parse the CSV once per file version instead of on every slider move;
+    # the mtime argument invalidates both caches when the file is edited
+    @st.cache_data(show_spinner=False)
+    def _load_pipeline_csv(path, mtime):
+        # Arrow's multithreaded parser (pyarrow ships with Streamlit); the
+        # result keeps the same NumPy dtypes as the default C engine
+        return pd.read_csv(path, engine="pyarrow") if mtime is not None else None
+
+    @st.cache_data(show_spinner=False)
+    def _cached_env_ranges(path, mtime):
+        return get_env_ranges(path, df=_load_pipeline_csv(path, mtime))
+
+    env_ranges = _cached_env_ranges(_csv_path, _csv_mtime)
 
     # Sidebar: Environmental Conditions
     with st.sidebar:
         st.markdown("### 🌡️ Environmental Conditions")
         st.caption("Adjust conditions to predict corrosion rate")
 
-        material = st.selectbox(
-            "Material",
-            options=env_ranges["materials"],
-            index=1,
-            help="Pipeline or component material type",
-            key="env_material",
-        )
-        temperature = st.slider(
-            "Temperature (°C)",
-            min_value=env_ranges["temperature_c"][0],
-            max_value=env_ranges["temperature_c"][1],
-            value=round((env_ranges["temperature_c"][0] + env_ranges["temperature_c"][1]) / 2, 1),
-            step=0.5,
-            key="env_temperature",
-        )
-        pressure = st.slider(
-            "Pressure (bar)",
-            min_value=env_ranges["pressure_bar"][0],
-            max_value=env_ranges["pressure_bar"][1],
-            value=round((env_ranges["pressure_bar"][0] + env_ranges["pressure_bar"][1]) / 2, 1),
-            step=0.5,
-            key="env_pressure",
-        )
-        ph = st.slider(
-            "pH",
-            min_value=env_ranges["ph"][0],
-            max_value=env_ranges["ph"][1],
-            value=round((env_ranges["ph"][0] + env_ranges["ph"][1]) / 2, 2),
-            step=0.01,
-            key="env_ph",
-        )
-        sulfur = st.slider(
-            "Sulfur Content (ppm)",
-            min_value=env_ranges["sulfur_ppm"][0],
-            max_value=env_ranges["sulfur_ppm"][1],
-            value=(env_ranges["sulfur_ppm"][0] + env_ranges["sulfur_ppm"][1]) // 2,
-            step=1,
-            key="env_sulfur",
-        )
-        flow_velocity = st.slider(
-            "Flow Velocity (m/s)",
-            min_value=env_ranges["flow_velocity_ms"][0],
-            max_value=env_ranges["flow_velocity_ms"][1],
-            value=round((env_ranges["flow_velocity_ms"][0] + env_ranges["flow_velocity_ms"][1]) / 2, 2),
-            step=0.01,
-            key="env_flow",
-        )
-        service_years = st.slider(
-            "Service Years",
-            min_value=env_ranges["service_years"][0],
-            max_value=env_ranges["service_years"][1],
-            value=(env_ranges["service_years"][0] + env_ranges["service_years"][1]) // 2,
-            step=1,
-            key="env_years",
-        )
+        # Inside a form, slider moves don't rerun the script; the values are
+        # applied together on submit
+        with st.form("env_form", border=False):
+            material = st.selectbox(
+                "Material",
+                options=env_ranges["materials"],
+                index=1,
+                help="Pipeline or component material type",
+                key="env_material",
+            )
+            temperature = st.slider(
+                "Temperature (°C)",
+                min_value=env_ranges["temperature_c"][0],
+                max_value=env_ranges["temperature_c"][1],
+                value=round((env_ranges["temperature_c"][0] + env_ranges["temperature_c"][1]) / 2, 1),
+                step=0.5,
+                key="env_temperature",
+            )
+            pressure = st.slider(
+                "Pressure (bar)",
+                min_value=env_ranges["pressure_bar"][0],
+                max_value=env_ranges["pressure_bar"][1],
+                value=round((env_ranges["pressure_bar"][0] + env_ranges["pressure_bar"][1]) / 2, 1),
+                step=0.5,
+                key="env_pressure",
+            )
+            ph = st.slider(
+                "pH",
+                min_value=env_ranges["ph"][0],
+                max_value=env_ranges["ph"][1],
+                value=round((env_ranges["ph"][0] + env_ranges["ph"][1]) / 2, 2),
+                step=0.01,
+                key="env_ph",
+            )
+            sulfur = st.slider(
+                "Sulfur Content (ppm)",
+                min_value=env_ranges["sulfur_ppm"][0],
+                max_value=env_ranges["sulfur_ppm"][1],
+                value=(env_ranges["sulfur_ppm"][0] + env_ranges["sulfur_ppm"][1]) // 2,
+                step=1,
+                key="env_sulfur",
+            )
+            flow_velocity = st.slider(
+                "Flow Velocity (m/s)",
+                min_value=env_ranges["flow_velocity_ms"][0],
+                max_value=env_ranges["flow_velocity_ms"][1],
+                value=round((env_ranges["flow_velocity_ms"][0] + env_ranges["flow_velocity_ms"][1]) / 2, 2),
+                step=0.01,
+                key="env_flow",
+            )
+            service_years = st.slider(
+                "Service Years",
+                min_value=env_ranges["service_years"][0],
+                max_value=env_ranges["service_years"][1],
+                value=(env_ranges["service_years"][0] + env_ranges["service_years"][1]) // 2,
+                step=1,
+                key="env_years",
+            )
+            env_submitted = st.form_submit_button(
+                "✅ Apply & Predict", use_container_width=True,
+            )
 
     # Description card
     st.markdown("""
@@ -1244,13 +1076,17 @@ elif page == "🌡️ Environmental Prediction":
     </div>
     """, unsafe_allow_html=True)
 
-    # Auto-train the model (cached)
+    # Auto-train the model (cached in-process, and on disk by CSV hash);
+    # mtime is part of the key so an edited CSV is picked up
     @st.cache_resource(show_spinner=False)
-    def _get_env_model(path):
-        return train_env_model(path)
+    def _get_env_model(path, mtime):
+        return load_or_train_env_model(
+            path, os.path.join(os.path.dirname(__file__), ".cache"),
+            df=_load_pipeline_csv(path, mtime),
+        )
 
     with st.spinner("Training environmental model on pipeline data…"):
-        env_result = _get_env_model(_csv_path)
+        env_result = _get_env_model(_csv_path, _csv_mtime)
 
     env_model = env_result["model"]
 
@@ -1284,20 +1120,24 @@ elif page == "🌡️ Environmental Prediction":
     """, unsafe_allow_html=True)
 
     # Feature importance + Actual vs Predicted charts
-    chart_col1, chart_col2 = st.columns(2)
+    # Figures depend only on the cached env_result, so build them once and
+    # reuse the objects across reruns. They are keyed by the same (path, mtime)
+    # fingerprint as the model; the leading underscore keeps the result arrays
+    # out of the per-rerun hash.
+    env_key = (_csv_path, _csv_mtime)
 
-    with chart_col1:
-        st.markdown('<div class="glass-card"><h3>📈 Feature Importance</h3></div>',
-                    unsafe_allow_html=True)
-        feat_names = env_result["feature_names"]
-        feat_imp = env_result["feature_importances"]
-        sorted_idx = np.argsort(feat_imp)
+    @st.cache_resource(show_spinner=False)
+    def _build_importance_fig(env_key, _env_result):
+        feat_names = _env_result["feature_names"]
+        feat_imp = _env_result["feature_importances"]
+        sorted_idx = _env_result["importance_order"]
+        sorted_imp = feat_imp[sorted_idx]
         fig_imp = go.Figure(go.Bar(
-            x=feat_imp[sorted_idx],
-            y=[feat_names[i] for i in sorted_idx],
+            x=sorted_imp,
+            y=np.asarray(feat_names)[sorted_idx],
             orientation="h",
             marker=dict(
-                color=feat_imp[sorted_idx],
+                color=sorted_imp,
                 colorscale=[[0, "#6366f1"], [0.5, "#8b5cf6"], [1, "#ec4899"]],
             ),
         ))
@@ -1310,23 +1150,30 @@ elif page == "🌡️ Environmental Prediction":
             xaxis=dict(title="Importance", gridcolor="rgba(99,102,241,0.1)"),
             yaxis=dict(gridcolor="rgba(99,102,241,0.1)"),
         )
-        st.plotly_chart(fig_imp, use_container_width=True)
+        return fig_imp
+
+    @st.cache_resource(show_spinner=False)
+    def _build_scatter_fig(env_key, _env_result, max_points=3000):
+        y_actual = _env_result["y_test"]
+        y_pred = _env_result["y_test_pred"]
+
+        # Large test sets are reduced server-side to a representative subset
+        order = np.argsort(y_actual, kind="stable")
+        keep = order[_lttb_indices(y_actual[order], y_pred[order], max_points)]
 
-    with chart_col2:
-        st.markdown('<div class="glass-card"><h3>🎯 Actual vs Predicted</h3></div>',
-                    unsafe_allow_html=True)
-        y_actual = env_result["y_test"]
-        y_pred = env_result["y_test_pred"]
         fig_scatter = go.Figure()
-        fig_scatter.add_trace(go.Scatter(
-            x=y_actual, y=y_pred,
+        # env_result stores these as float32 already, so this is a no-op
+        # there; float32 halves the typed-array payload
+        fig_scatter.add_trace(go.Scattergl(
+            x=y_actual[keep].astype(np.float32, copy=False),
+            y=y_pred[keep].astype(np.float32, copy=False),
             mode="markers",
             marker=dict(size=5, color="#6366f1", opacity=0.4),
             name="Predictions",
         ))
         line_min = min(y_actual.min(), y_pred.min())
         line_max = max(y_actual.max(), y_pred.max())
-        fig_scatter.add_trace(go.Scatter(
+        fig_scatter.add_trace(go.Scattergl(
             x=[line_min, line_max], y=[line_min, line_max],
             mode="lines",
             line=dict(color="#ef4444", dash="dash", width=2),
@@ -1342,166 +1189,118 @@ elif page == "🌡️ Environmental Prediction":
             yaxis=dict(title="Predicted (mm/yr)", gridcolor="rgba(99,102,241,0.1)"),
             showlegend=False,
         )
+        return fig_scatter
+
+    chart_col1, chart_col2 = st.columns(2)
+
+    with chart_col1:
+        st.markdown('<div class="glass-card"><h3>📈 Feature Importance</h3></div>',
+                    unsafe_allow_html=True)
+        fig_imp = _build_importance_fig(env_key, env_result)
+        st.plotly_chart(fig_imp, use_container_width=True, config=STATIC_PLOT_CONFIG)
+
+    with chart_col2:
+        st.markdown('<div class="glass-card"><h3>🎯 Actual vs Predicted</h3></div>',
+                    unsafe_allow_html=True)
+        fig_scatter = _build_scatter_fig(env_key, env_result)
         st.plotly_chart(fig_scatter, use_container_width=True)
 
     # Current conditions summary
-    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-    st.markdown(f"""
-    <div class="metric-row">
-        <div class="metric-card">
-            <div class="label">Material</div>
-            <div class="value" style="font-size:0.85rem;">{material}</div>
-        </div>
-        <div class="metric-card">
-            <div class="label">Temp</div>
-            <div class="value">{temperature}°C</div>
-        </div>
-        <div class="metric-card">
-            <div class="label">Pressure</div>
-            <div class="value">{pressure} bar</div>
-        </div>
-        <div class="metric-card">
-            <div class="label">pH</div>
-            <div class="value">{ph}</div>
-        </div>
-        <div class="metric-card">
-            <div class="label">Sulfur</div>
-            <div class="value">{sulfur} ppm</div>
-        </div>
-        <div class="metric-card">
-            <div class="label">Flow</div>
-            <div class="value">{flow_velocity} m/s</div>
-        </div>
-        <div class="metric-card">
-            <div class="label">Service</div>
-            <div class="value">{service_years} yr</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # Predict button
-    if st.button("⚡ Predict Corrosion Rate", use_container_width=True, key="env_predict"):
-        try:
-            with st.spinner("Predicting…"):
-                corrosion_rate = predict_from_env(
-                    env_model,
-                    material=material,
-                    temperature=temperature,
-                    pressure=pressure,
-                    ph=ph,
-                    sulfur=float(sulfur),
-                    flow_velocity=flow_velocity,
-                    service_years=service_years,
-                )
-                risk_label, risk_color, risk_bg, risk_border = classify_risk(corrosion_rate)
+    st.html('<div class="section-divider"></div>' + _metric_row_html((
+        ("Material", material, "font-size:0.85rem;"),
+        ("Temp", f"{temperature}°C", ""),
+        ("Pressure", f"{pressure} bar", ""),
+        ("pH", ph, ""),
+        ("Sulfur", f"{sulfur} ppm", ""),
+        ("Flow", f"{flow_velocity} m/s", ""),
+        ("Service", f"{service_years} yr", ""),
+    )))
+
+    # Predict button — a fragment, so clicking it reruns only this block and
+    # not the charts and dataset preview around it. Condition values come
+    # from the last full run (the sidebar form triggers one on submit).
+    @st.fragment
+    def _env_predict_fragment(run_now):
+        if st.button("⚡ Predict Corrosion Rate", use_container_width=True, key="env_predict") or run_now:
+            try:
+                with st.spinner("Predicting…"):
+                    corrosion_rate = predict_from_env(
+                        env_model,
+                        material=material,
+                        temperature=temperature,
+                        pressure=pressure,
+                        ph=ph,
+                        sulfur=float(sulfur),
+                        flow_velocity=flow_velocity,
+                        service_years=service_years,
+                    )
+                    risk_label, risk_color, risk_bg, risk_border = classify_risk(corrosion_rate)
 
-            st.markdown(f"""
-            <div class="metric-row">
-                <div class="metric-card" style="flex:2;">
-                    <div class="label">Predicted Corrosion Rate</div>
-                    <div class="value" style="font-size:2rem; color:{risk_color};">
-                        {corrosion_rate:.4f} <span style="font-size:0.9rem;">mm/yr</span>
+                st.markdown(f"""
+                <div class="metric-row">
+                    <div class="metric-card" style="flex:2;">
+                        <div class="label">Predicted Corrosion Rate</div>
+                        <div class="value" style="font-size:2rem; color:{risk_color};">
+                            {corrosion_rate:.4f} <span style="font-size:0.9rem;">mm/yr</span>
+                        </div>
                     </div>
-                </div>
-                <div class="metric-card" style="flex:1; border-color:{risk_border}; background:{risk_bg};">
-                    <div class="label">Risk Level</div>
-                    <div class="value" style="font-size:1.8rem; color:{risk_color};">
-                        {"🟢" if risk_label == "Low" else "🟡" if risk_label == "Moderate" else "🔴"} {risk_label}
+                    <div class="metric-card" style="flex:1; border-color:{risk_border}; background:{risk_bg};">
+                        <div class="label">Risk Level</div>
+                        <div class="value" style="font-size:1.8rem; color:{risk_color};">
+                            {RISK_EMOJI[risk_label]} {risk_label}
+                        </div>
+                    </div>
+                    <div class="metric-card">
+                        <div class="label">Model Type</div>
+                        <div class="value" style="font-size:0.8rem;">HistGradientBoosting</div>
                     </div>
                 </div>
-                <div class="metric-card">
-                    <div class="label">Model Type</div>
-                    <div class="value" style="font-size:0.8rem;">GradientBoosting</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
 
-            # Gauge chart
-            gauge_fig = create_gauge_chart(corrosion_rate, risk_label, risk_color)
-            st.plotly_chart(gauge_fig, use_container_width=True)
+                # Gauge chart
+                st.html(create_gauge_svg(corrosion_rate, risk_label, risk_color))
+
+                # Risk summary table
+                st.html(_summary_table_html((
+                    ("Risk Level", risk_label, f"font-weight:700; color:{risk_color};"),
+                    ("Corrosion Rate", f"{corrosion_rate:.4f} mm/yr", _SUMMARY_TEXT),
+                    ("Material", material, _SUMMARY_TEXT),
+                    ("Temperature", f"{temperature}°C", _SUMMARY_TEXT),
+                    ("Pressure", f"{pressure} bar", _SUMMARY_TEXT),
+                    ("pH", ph, _SUMMARY_TEXT),
+                    ("Sulfur", f"{sulfur} ppm", _SUMMARY_TEXT),
+                    ("Flow Velocity", f"{flow_velocity} m/s", _SUMMARY_TEXT),
+                    ("Service Years", f"{service_years} years", _SUMMARY_TEXT),
+                )))
 
-            # Risk summary table
-            st.markdown(f"""
-            <div class="glass-card">
-                <h3>📋 Risk Assessment Summary</h3>
-                <table style="width:100%; border-collapse:collapse; margin-top:0.8rem;">
-                    <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                        <td style="padding:0.6rem; color:#94a3b8;">Risk Level</td>
-                        <td style="padding:0.6rem; font-weight:700; color:{risk_color};">{risk_label}</td>
-                    </tr>
-                    <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                        <td style="padding:0.6rem; color:#94a3b8;">Corrosion Rate</td>
-                        <td style="padding:0.6rem; color:#e8edf5;">{corrosion_rate:.4f} mm/yr</td>
-                    </tr>
-                    <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                        <td style="padding:0.6rem; color:#94a3b8;">Material</td>
-                        <td style="padding:0.6rem; color:#e8edf5;">{material}</td>
-                    </tr>
-                    <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                        <td style="padding:0.6rem; color:#94a3b8;">Temperature</td>
-                        <td style="padding:0.6rem; color:#e8edf5;">{temperature}°C</td>
-                    </tr>
-                    <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                        <td style="padding:0.6rem; color:#94a3b8;">Pressure</td>
-                        <td style="padding:0.6rem; color:#e8edf5;">{pressure} bar</td>
-                    </tr>
-                    <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                        <td style="padding:0.6rem; color:#94a3b8;">pH</td>
-                        <td style="padding:0.6rem; color:#e8edf5;">{ph}</td>
-                    </tr>
-                    <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                        <td style="padding:0.6rem; color:#94a3b8;">Sulfur</td>
-                        <td style="padding:0.6rem; color:#e8edf5;">{sulfur} ppm</td>
-                    </tr>
-                    <tr style="border-bottom:1px solid rgba(99,102,241,0.15);">
-                        <td style="padding:0.6rem; color:#94a3b8;">Flow Velocity</td>
-                        <td style="padding:0.6rem; color:#e8edf5;">{flow_velocity} m/s</td>
-                    </tr>
-                    <tr>
-                        <td style="padding:0.6rem; color:#94a3b8;">Service Years</td>
-                        <td style="padding:0.6rem; color:#e8edf5;">{service_years} years</td>
-                    </tr>
-                </table>
-            </div>
-            """, unsafe_allow_html=True)
+            except Exception as e:
+                st.error(f"❌ Prediction failed: {str(e)}")
+                st.exception(e)
 
-        except Exception as e:
-            st.error(f"❌ Prediction failed: {str(e)}")
-            st.exception(e)
+    _env_predict_fragment(env_submitted)
 
     # Risk Classification + Pipeline data preview
-    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-    st.markdown("### 🎯 Risk Classification")
-    risk_cols = st.columns(3)
-    risk_items = [
-        ("🟢", "Low Risk", "< 0.1 mm/yr", "Minimal corrosion — safe for continued operation", "fc-green"),
-        ("🟡", "Moderate Risk", "0.1 – 0.5 mm/yr", "Noticeable corrosion — schedule maintenance", "fc-amber"),
-        ("🔴", "Severe Risk", "≥ 0.5 mm/yr", "Critical corrosion — immediate action required", "fc-purple"),
-    ]
-    for col, (icon, title, threshold, desc, color) in zip(risk_cols, risk_items):
-        with col:
-            st.markdown(f"""
-            <div class="feature-card {color}">
-                <span class="fc-icon">{icon}</span>
-                <div class="fc-title">{title}</div>
-                <div class="fc-desc" style="font-weight:700; margin-bottom:0.3rem;">{threshold}</div>
-                <div class="fc-desc">{desc}</div>
-            </div>
-            """, unsafe_allow_html=True)
+    _render_risk_classification()
 
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
     st.markdown("### 📊 Pipeline Corrosion Dataset")
     st.caption("Reference data used for environmental condition ranges and model training")
     try:
-        _pipeline_df = pd.read_csv(_csv_path)
+        # 50-row slice cached per file version; number formats are applied by
+        # the grid itself instead of rebuilding a per-cell Styler on each rerun
+        @st.cache_data(show_spinner=False)
+        def _pipeline_preview(path, mtime):
+            return _load_pipeline_csv(path, mtime).head(50)
+
         st.dataframe(
-            _pipeline_df.head(50).style.format({
-                "temperature_c": "{:.1f}",
-                "pressure_bar": "{:.1f}",
-                "ph": "{:.2f}",
-                "flow_velocity_ms": "{:.2f}",
-                "corrosion_rate_mmpy": "{:.3f}",
-            }),
+            _pipeline_preview(_csv_path, _csv_mtime),
+            column_config={
+                "temperature_c": st.column_config.NumberColumn(format="%.1f"),
+                "pressure_bar": st.column_config.NumberColumn(format="%.1f"),
+                "ph": st.column_config.NumberColumn(format="%.2f"),
+                "flow_velocity_ms": st.column_config.NumberColumn(format="%.2f"),
+                "corrosion_rate_mmpy": st.column_config.NumberColumn(format="%.3f"),
+            },
             use_container_width=True,
             height=350,
         )
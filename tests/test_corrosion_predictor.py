@@ -0,0 +1,29 @@
+"""Tests for utils.corrosion_predictor."""
+
+import os
+
+from utils import corrosion_predictor
+from utils.corrosion_predictor import load_or_train_env_model
+
+
+def test_env_model_cache_prunes_stale_entries(tmp_path, monkeypatch):
+    """Writing a new env-model cache file removes older ones for the same CSV."""
+    csv = tmp_path / "env.csv"
+    csv.write_text("a,b\n1,2\n")
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    digest = "0" * 64
+    for name in (
+        f"env_model_v1_{digest}.pkl",           # pre-dataset-name entry
+        f"env_model_env_v1_{digest}.pkl",       # older version, same dataset
+        f"env_model_other_v1_{digest}.pkl",     # different dataset — kept
+    ):
+        (cache / name).write_bytes(b"")
+    monkeypatch.setattr(corrosion_predictor, "train_env_model", lambda path, df=None: {"ok": True})
+
+    assert load_or_train_env_model(str(csv), str(cache)) == {"ok": True}
+
+    left = sorted(os.listdir(cache))
+    assert f"env_model_other_v1_{digest}.pkl" in left
+    assert len(left) == 2
+    assert any(n.startswith(f"env_model_env_v{corrosion_predictor.ENV_MODEL_CACHE_VERSION}_") for n in left)
@@ -0,0 +1,19 @@
+"""Tests for utils.eis_simulation."""
+
+import re
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from utils.eis_simulation import equation_svg  # noqa: E402
+
+
+def test_equation_svg_has_no_white_background():
+    """Equations are drawn on a transparent figure, not an opaque white patch."""
+    svg = equation_svg(r"Z = R_1 + \frac{1}{\frac{1}{R_2} + \frac{1}{Z_{Q_1}}}")
+
+    fills = {f.lower() for f in re.findall(r"fill:\s*(#[0-9a-fA-F]{3,6}|white)", svg)}
+    assert fills, "expected the equation glyphs to carry a fill colour"
+    assert not fills & {"#ffffff", "#fff", "white"}
+    assert "#e8edf5" in fills
@@ -0,0 +1,57 @@
+"""Tests for the Keras inference path in utils.ml_model."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from utils.ml_model import _require_tf, evaluate_model, fuse_bn_for_inference, xla_predict  # noqa: E402
+
+tf, keras = _require_tf()
+
+
+def _inputs(n=16, width=4):
+    return np.random.default_rng(0).random((n, width), dtype=np.float32)
+
+
+def test_evaluate_model_non_chain_model():
+    """Branched functional models are evaluated unfused, like model.predict."""
+    inputs = keras.layers.Input((4,))
+    a = keras.layers.Dense(4)(inputs)
+    b = keras.layers.Dense(4)(a)
+    outputs = keras.layers.Dense(2)(keras.layers.Add()([a, b]))
+    model = keras.Model(inputs, outputs)
+    x = _inputs()
+
+    assert fuse_bn_for_inference(model) is model
+    y_pred, metrics = evaluate_model(model, x, np.zeros((len(x), 2)))
+    np.testing.assert_allclose(y_pred, model.predict(x, verbose=0), rtol=1e-5, atol=1e-6)
+    assert len(metrics) == 2
+
+
+def test_fuse_bn_for_inference_chain_matches_model():
+    """Folding BN into a chain model leaves its predictions unchanged."""
+    model = keras.Sequential([
+        keras.layers.Input((4,)),
+        keras.layers.Dense(8),
+        keras.layers.BatchNormalization(),
+        keras.layers.Dropout(0.2),
+        keras.layers.Dense(2),
+    ])
+    bn = model.layers[1]
+    rng = np.random.default_rng(1)
+    bn.set_weights([rng.random(8) + 0.5, rng.random(8), rng.random(8), rng.random(8) + 0.5])
+    x = _inputs()
+
+    fused = fuse_bn_for_inference(model)
+    assert not any(isinstance(l, keras.layers.BatchNormalization) for l in fused.layers)
+    np.testing.assert_allclose(fused.predict(x, verbose=0), model.predict(x, verbose=0), rtol=1e-4, atol=1e-5)
+
+
+def test_xla_predict_empty_input():
+    """An empty batch gives an empty (0, n_outputs) prediction, not an error."""
+    inputs = keras.layers.Input((4,))
+    model = keras.Model(inputs, keras.layers.Dense(3)(inputs))
+
+    y_pred = xla_predict(model, np.empty((0, 4), dtype=np.float32))
+    assert y_pred.shape == (0, 3)
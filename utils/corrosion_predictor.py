@@ -6,10 +6,13 @@ and environmental conditions.
 No TensorFlow dependency — uses joblib for sklearn model loading.
 """
 
+import hashlib
+import os
+import re
+
 import numpy as np
 import pandas as pd
 import joblib
-import plotly.graph_objects as go
 
 
 # ---------------------------------------------------------------------------
@@ -22,6 +25,11 @@ RISK_THRESHOLDS = {
 }
 
 
+# Parallel lookup arrays: searchsorted over the upper bounds picks the bucket
+_RISK_LABELS = np.array(list(RISK_THRESHOLDS))
+_RISK_EDGES = np.array([r["max"] for r in RISK_THRESHOLDS.values()][:-1])
+
+
 def classify_risk(corrosion_rate: float) -> tuple:
     """
     Classify corrosion rate into risk level.
@@ -29,15 +37,18 @@ def classify_risk(corrosion_rate: float) -> tuple:
     Returns:
         (risk_label, color_hex, bg_rgba, border_rgba)
     """
-    if corrosion_rate < 0.1:
-        r = RISK_THRESHOLDS["Low"]
-        return "Low", r["color"], r["bg"], r["border"]
-    elif corrosion_rate < 0.5:
-        r = RISK_THRESHOLDS["Moderate"]
-        return "Moderate", r["color"], r["bg"], r["border"]
-    else:
-        r = RISK_THRESHOLDS["Severe"]
-        return "Severe", r["color"], r["bg"], r["border"]
+    label = str(classify_risk_batch(corrosion_rate))
+    r = RISK_THRESHOLDS[label]
+    return label, r["color"], r["bg"], r["border"]
+
+
+def classify_risk_batch(corrosion_rates) -> np.ndarray:
+    """
+    Vectorized classify_risk: map an array of corrosion rates to an array
+    of risk labels ("Low", "Moderate", "Severe") in one bucketization pass.
+    """
+    idx = np.searchsorted(_RISK_EDGES, corrosion_rates, side="right")
+    return _RISK_LABELS[idx]
 
 
 # ---------------------------------------------------------------------------
@@ -74,7 +85,8 @@ def load_spectrum(file_buffer) -> np.ndarray:
     Raises ValueError on invalid format.
     """
     try:
-        df = pd.read_csv(file_buffer)
+        # Arrow's multithreaded parser (pyarrow ships with Streamlit)
+        df = pd.read_csv(file_buffer, engine="pyarrow")
     except Exception as e:
         raise ValueError(f"Failed to read CSV file: {e}")
 
@@ -89,7 +101,12 @@ def load_spectrum(file_buffer) -> np.ndarray:
             "Please upload a file with numeric EIS spectrum data."
         )
 
-    return numeric_df.values
+    # One float64 → float32 copy (float32 matches the precision the models are
+    # trained at). Passing dtype to read_csv wouldn't save it: the pyarrow
+    # engine parses to float64 and casts afterwards, and the cast would fail
+    # on the non-numeric columns filtered out above. copy=False only skips
+    # the copy for frames that are already float32.
+    return numeric_df.to_numpy(dtype=np.float32, copy=False)
 
 
 def load_mat_spectrum(file_buffer) -> np.ndarray:
@@ -102,37 +119,39 @@ def load_mat_spectrum(file_buffer) -> np.ndarray:
         3. Augment: append negated channels → (N, freq_points, 2*channels)
         4. Take the FIRST sample and flatten → (1, freq_points * 2 * channels)
 
-    This produces the exact feature count the GradientBoostingRegressor expects
+    This produces the exact feature count the spectrum model (the
+    make_boosting_regressor learner — XGBoost, LightGBM or
+    HistGradientBoostingRegressor) expects
     (e.g. 100 freq_points × 3 channels × 2 = 600 features).
     """
-    import scipy.io
+    from utils.ml_model import load_mat_sample
 
+    # Only the first sample is used, so only that one is read and preprocessed
     try:
-        mat = scipy.io.loadmat(file_buffer)
-    except Exception as e:
-        raise ValueError(f"Failed to read .mat file: {e}")
-
-    if "x_data" not in mat:
+        x0 = load_mat_sample(file_buffer, "x_data", 0)  # (channels, freq_points)
+    except KeyError:
         raise ValueError(
             "The .mat file must contain an 'x_data' variable "
             "(same format used for model training)."
         )
+    except Exception as e:
+        raise ValueError(f"Failed to read .mat file: {e}")
 
-    x = mat["x_data"]  # (N, channels, freq_points)
-
-    # Replicate training preprocessing
-    x = np.swapaxes(x, 1, 2)  # → (N, freq_points, channels)
+    return _spectrum_features(x0).reshape(1, -1)
 
-    n_channels = x.shape[-1]
-    # Augment with negated channels (matches training pipeline)
-    augmented = np.zeros((*x.shape[:-1], n_channels * 2))
-    augmented[:, :, :n_channels] = x
-    for ch in range(n_channels):
-        augmented[:, :, n_channels + ch] = x[:, :, ch] * -1
 
-    # Take first sample, flatten → (1, freq_pts * 2 * channels)
-    sample = augmented[0].flatten().astype(np.float64)
-    return sample.reshape(1, -1)
+def _spectrum_features(sample: np.ndarray) -> np.ndarray:
+    """
+    Training preprocessing for a single (channels, freq_points) sample:
+    transpose to (freq_points, channels), append the negated channels and
+    flatten → (freq_points * 2 * channels,) float32, the dtype training casts
+    its feature matrix to.
+    """
+    s = np.asarray(sample, dtype=np.float32).T
+    out = np.empty((s.shape[0], 2 * s.shape[1]), dtype=np.float32)
+    out[:, :s.shape[1]] = s
+    np.negative(s, out=out[:, s.shape[1]:])
+    return out.ravel()
 
 
 # ---------------------------------------------------------------------------
@@ -151,9 +170,16 @@ MATERIAL_TYPES = [
 ]
 
 
-def encode_material(material: str) -> list:
-    """One-hot encode material type."""
-    return [1.0 if m == material else 0.0 for m in MATERIAL_TYPES]
+# One-hot rows looked up by index; the extra all-zero row is for materials
+# outside MATERIAL_TYPES
+_MATERIAL_INDEX = {m: i for i, m in enumerate(MATERIAL_TYPES)}
+_MATERIAL_ONE_HOT = np.eye(len(MATERIAL_TYPES) + 1, len(MATERIAL_TYPES), dtype=np.float32)
+_MATERIAL_ONE_HOT.setflags(write=False)
+
+
+def encode_material(material: str) -> np.ndarray:
+    """One-hot encode material type (read-only view, all zeros if unknown)."""
+    return _MATERIAL_ONE_HOT[_MATERIAL_INDEX.get(material, len(MATERIAL_TYPES))]
 
 
 def build_feature_vector(
@@ -177,19 +203,55 @@ def build_feature_vector(
 
     Each value is a 2D array of shape (1, n_features).
     """
-    flat_spectrum = spectrum.flatten().astype(np.float64)
+    return build_feature_matrix(
+        [spectrum], material, temperature, pressure, ph, sulfur,
+        flow_velocity, service_years,
+    )
+
+
+def build_feature_matrix(
+    spectra: list,
+    material: str,
+    temperature: float,
+    pressure: float,
+    ph: float,
+    sulfur: float,
+    flow_velocity: float,
+    service_years: int,
+) -> dict:
+    """
+    Batch version of build_feature_vector: one row per spectrum.
+
+    The environmental values are shared by every spectrum, so they are
+    broadcast across the batch instead of being rebuilt per row.
+    Each value is a 2D array of shape (n_spectra, n_features); the spectra
+    are written once into the "full" matrix and the other two candidates
+    are column views of it, so only the candidate a model uses is ever
+    copied again.
+    """
+    flat = [np.asarray(s, dtype=np.float32).ravel() for s in spectra]
+    if not flat:
+        raise ValueError("At least one spectrum is required.")
+    if len({f.size for f in flat}) > 1:
+        raise ValueError(
+            "All spectra in a batch must have the same number of values "
+            f"(got {sorted({f.size for f in flat})})."
+        )
+    n_spec = flat[0].size
 
-    material_encoded = encode_material(material)
     env_features = [
         temperature, pressure, ph, sulfur, flow_velocity, float(service_years),
     ]
-    env_arr = np.array(material_encoded + env_features, dtype=np.float64)
+    n_mat = len(MATERIAL_TYPES)
+    full = np.empty((len(flat), n_spec + n_mat + len(env_features)), dtype=np.float32)
+    np.stack(flat, out=full[:, :n_spec])
+    full[:, n_spec:n_spec + n_mat] = encode_material(material)
+    full[:, n_spec + n_mat:] = env_features
 
-    full = np.concatenate([flat_spectrum, env_arr])
     return {
-        "full": full.reshape(1, -1),
-        "spectrum": flat_spectrum.reshape(1, -1),
-        "env": env_arr.reshape(1, -1),
+        "full": full,
+        "spectrum": full[:, :n_spec],
+        "env": full[:, n_spec:],
     }
 
 
@@ -204,92 +266,112 @@ def predict_corrosion(model, features: dict) -> float:
 
     Returns the predicted corrosion rate as a float.
     """
+    return float(predict_corrosion_batch(model, features)[0])
+
+
+def predict_corrosion_batch(model, features: dict) -> np.ndarray:
+    """
+    Predict corrosion rates for every row of a feature batch in a single
+    model.predict call.
+
+    Parameters:
+        model    : a fitted sklearn estimator with .predict()
+        features : dict returned by build_feature_matrix()
+
+    Returns a 1D array with one corrosion rate per spectrum (the first
+    model output for multi-output models).
+    """
+    n_rows = features["full"].shape[0]
+
+    def _first_output(prediction):
+        return np.asarray(prediction, dtype=np.float64).reshape(n_rows, -1)[:, 0]
+
     # Determine expected feature count from the model
     expected = getattr(model, "n_features_in_", None)
 
-    # Try candidates in preference order
-    for key in ("full", "spectrum", "env"):
-        vec = features[key]
-        n = vec.shape[1]
-        if expected is not None and n == expected:
-            prediction = model.predict(vec)
-            return float(np.asarray(prediction).flatten()[0])
+    # One lookup by feature count; inserted in reverse preference order so
+    # "full" wins over "spectrum" over "env" if two widths coincide
+    by_width = {features[key].shape[1]: features[key] for key in ("env", "spectrum", "full")}
+    vec = by_width.get(expected)
+    if vec is not None:
+        return _first_output(model.predict(vec))
 
     # If no exact match found, try full vector anyway (let sklearn raise
     # a clear error with actual vs expected counts)
     try:
-        prediction = model.predict(features["full"])
-        return float(np.asarray(prediction).flatten()[0])
+        return _first_output(model.predict(features["full"]))
     except ValueError:
         # Last resort: try spectrum-only
-        prediction = model.predict(features["spectrum"])
-        return float(np.asarray(prediction).flatten()[0])
+        return _first_output(model.predict(features["spectrum"]))
 
 
 # ---------------------------------------------------------------------------
 # Gauge chart
 # ---------------------------------------------------------------------------
-def create_gauge_chart(corrosion_rate: float, risk_label: str, risk_color: str) -> go.Figure:
+def create_gauge_svg(corrosion_rate: float, risk_label: str, risk_color: str) -> str:
     """
-    Create a Plotly gauge chart showing the predicted corrosion rate.
+    Gauge of the predicted corrosion rate (risk-coloured bar over the
+    low / medium / high bands), drawn as an inline SVG semicircle for
+    st.html — no Plotly figure to serialize or initialise for one scalar.
+
+    Arcs use pathLength=100, so dash lengths are percentages of the scale.
     """
-    # Dynamic max for gauge scale
     gauge_max = max(1.5, corrosion_rate * 1.5)
 
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number+delta",
-        value=corrosion_rate,
-        number=dict(
-            font=dict(size=48, color="#e8edf5", family="Inter, sans-serif"),
-            suffix=" mm/yr",
-        ),
-        title=dict(
-            text=f"<b>Corrosion Rate</b><br><span style='font-size:0.85em; color:{risk_color}'>"
-                 f"Risk: {risk_label}</span>",
-            font=dict(size=18, color="#e8edf5"),
-        ),
-        gauge=dict(
-            axis=dict(
-                range=[0, gauge_max],
-                tickwidth=2,
-                tickcolor="#4b5563",
-                dtick=round(gauge_max / 5, 2),
-            ),
-            bar=dict(color=risk_color, thickness=0.7),
-            bgcolor="rgba(13,17,23,0.6)",
-            borderwidth=2,
-            bordercolor="rgba(99,102,241,0.2)",
-            steps=[
-                dict(range=[0, 0.1], color="rgba(16,185,129,0.15)"),
-                dict(range=[0.1, 0.5], color="rgba(245,158,11,0.15)"),
-                dict(range=[0.5, gauge_max], color="rgba(239,68,68,0.15)"),
-            ],
-            threshold=dict(
-                line=dict(color="#e8edf5", width=3),
-                thickness=0.8,
-                value=corrosion_rate,
-            ),
-        ),
-    ))
-
-    fig.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Inter, sans-serif", color="#e8edf5"),
-        height=350,
-        margin=dict(l=30, r=30, t=80, b=30),
+    def pct(v):
+        return 100.0 * min(max(v, 0.0), gauge_max) / gauge_max
+
+    arc = 'd="M 40 175 A 110 110 0 0 1 260 175" pathLength="100" fill="none"'
+    bands = "".join(
+        f'<path {arc} stroke="{color}" stroke-width="34" '
+        f'stroke-dasharray="{pct(hi) - pct(lo):.2f} 100" stroke-dashoffset="{-pct(lo):.2f}"/>'
+        for lo, hi, color in (
+            (0.0, 0.1, "rgba(16,185,129,0.15)"),
+            (0.1, 0.5, "rgba(245,158,11,0.15)"),
+            (0.5, gauge_max, "rgba(239,68,68,0.15)"),
+        )
     )
 
-    return fig
+    # Threshold tick at the value's angle (180° at zero → 0° at gauge_max)
+    theta = np.pi * (1.0 - pct(corrosion_rate) / 100.0)
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    x1, y1 = 150 + 88 * cos_t, 175 - 88 * sin_t
+    x2, y2 = 150 + 132 * cos_t, 175 - 132 * sin_t
+
+    return (
+        '<div style="text-align:center;">'
+        '<svg viewBox="0 0 300 215" style="width:100%; max-width:460px;" '
+        'font-family="Inter, sans-serif">'
+        f'<text x="150" y="18" text-anchor="middle" fill="#e8edf5" font-size="15" '
+        f'font-weight="700">Corrosion Rate</text>'
+        f'<text x="150" y="36" text-anchor="middle" fill="{risk_color}" font-size="12">'
+        f'Risk: {risk_label}</text>'
+        f'<path {arc} stroke="rgba(13,17,23,0.6)" stroke-width="36"/>'
+        f"{bands}"
+        f'<path {arc} stroke="{risk_color}" stroke-width="24" '
+        f'stroke-dasharray="{pct(corrosion_rate):.2f} 100"/>'
+        f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
+        'stroke="#e8edf5" stroke-width="3"/>'
+        f'<text x="40" y="197" text-anchor="middle" fill="#94a3b8" font-size="10">0</text>'
+        f'<text x="260" y="197" text-anchor="middle" fill="#94a3b8" font-size="10">'
+        f"{gauge_max:.2f}</text>"
+        f'<text x="150" y="165" text-anchor="middle" fill="#e8edf5" font-size="30" '
+        f'font-weight="700">{corrosion_rate:.4f}</text>'
+        '<text x="150" y="187" text-anchor="middle" fill="#94a3b8" font-size="12">mm/yr</text>'
+        "</svg></div>"
+    )
 
 
-def get_env_ranges(csv_path: str) -> dict:
+def get_env_ranges(csv_path: str, df: pd.DataFrame = None) -> dict:
     """
     Read the corrosion pipeline dataset and return min/max/unique values
     for environmental condition selectors.
+
+    Pass an already-parsed df to skip reading csv_path.
     """
     try:
-        df = pd.read_csv(csv_path)
+        if df is None:
+            df = pd.read_csv(csv_path)
     except Exception:
         # Fallback defaults if file is missing
         return {
@@ -316,23 +398,16 @@ def get_env_ranges(csv_path: str) -> dict:
 # ---------------------------------------------------------------------------
 # Environmental model — train from CSV data
 # ---------------------------------------------------------------------------
-def train_env_model(csv_path: str) -> dict:
+def load_env_xy(df: pd.DataFrame) -> tuple:
     """
-    Train a GradientBoosting model on corrosion_pipeline_data.csv.
+    Build the env-model design matrix from the pipeline DataFrame.
 
     Features: material (one-hot) + temperature, pressure, ph,
               sulfur, flow_velocity, service_years
     Target:   corrosion_rate_mmpy
 
-    Returns dict with keys: model, train_mae, test_mae, train_r2, test_r2,
-                            feature_names, feature_importances
+    Returns (X float32 array, y array, feature_names).
     """
-    from sklearn.ensemble import GradientBoostingRegressor
-    from sklearn.model_selection import train_test_split
-    from sklearn.metrics import mean_absolute_error, r2_score
-
-    df = pd.read_csv(csv_path)
-
     # One-hot encode material
     material_dummies = pd.get_dummies(df["material"], prefix="mat")
     X = pd.concat([
@@ -342,16 +417,34 @@ def train_env_model(csv_path: str) -> dict:
     ], axis=1)
     y = df["corrosion_rate_mmpy"]
 
-    feature_names = list(X.columns)
+    return X.to_numpy(dtype=np.float32), y.to_numpy(), list(X.columns)
+
+
+def fit_env_model(X: np.ndarray, y: np.ndarray, feature_names: list) -> dict:
+    """
+    Fit and evaluate the HistGradientBoosting env model on a prepared
+    (X, y) from load_env_xy.
+
+    Returns dict with keys: model, train_mae, test_mae, train_r2, test_r2,
+                            feature_names, feature_importances,
+                            importance_order (ascending argsort)
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.inspection import permutation_importance
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_absolute_error, r2_score
 
     X_train, X_test, y_train, y_test = train_test_split(
-        X.values, y.values, test_size=0.2, random_state=42,
+        X, y, test_size=0.2, random_state=42,
     )
-
-    model = GradientBoostingRegressor(
-        n_estimators=300,
+    # Early stopping on an internal validation split caps the boosting rounds
+    model = HistGradientBoostingRegressor(
+        max_iter=500,
         learning_rate=0.05,
         max_depth=4,
+        early_stopping=True,
+        validation_fraction=0.2,
+        n_iter_no_change=10,
         random_state=42,
     )
     model.fit(X_train, y_train)
@@ -359,6 +452,13 @@ def train_env_model(csv_path: str) -> dict:
     y_train_pred = model.predict(X_train)
     y_test_pred = model.predict(X_test)
 
+    # HGBR has no impurity importances; use normalised permutation importances
+    importances = permutation_importance(
+        model, X_test, y_test, n_repeats=5, random_state=42,
+    ).importances_mean.clip(min=0)
+    if importances.sum() > 0:
+        importances = importances / importances.sum()
+
     return {
         "model": model,
         "train_mae": mean_absolute_error(y_train, y_train_pred),
@@ -366,12 +466,82 @@ def train_env_model(csv_path: str) -> dict:
         "train_r2": r2_score(y_train, y_train_pred),
         "test_r2": r2_score(y_test, y_test_pred),
         "feature_names": feature_names,
-        "feature_importances": model.feature_importances_,
-        "y_test": y_test,
-        "y_test_pred": y_test_pred,
+        "feature_importances": importances,
+        "importance_order": np.argsort(importances),
+        # Plot-only copies: contiguous float32 ndarrays serialize as compact
+        # typed arrays (metrics above use the full-precision values)
+        "y_test": np.ascontiguousarray(y_test, dtype=np.float32),
+        "y_test_pred": np.ascontiguousarray(y_test_pred, dtype=np.float32),
     }
 
 
+def train_env_model(csv_path: str, df: pd.DataFrame = None) -> dict:
+    """
+    Train a HistGradientBoosting model on corrosion_pipeline_data.csv.
+    Pass an already-parsed df to skip reading csv_path.
+
+    Returns the fit_env_model result dict.
+    """
+    if df is None:
+        df = pd.read_csv(csv_path)
+    return fit_env_model(*load_env_xy(df))
+
+
+# Bump whenever load_env_xy or fit_env_model change so stale on-disk models are ignored
+ENV_MODEL_CACHE_VERSION = 4
+
+
+def load_or_train_env_model(csv_path: str, cache_dir: str, df: pd.DataFrame = None) -> dict:
+    """
+    Return the train_env_model result for csv_path, reusing a copy persisted
+    in cache_dir when one exists for the same CSV contents.
+
+    The on-disk file is keyed by the CSV's name and the SHA-256 of its bytes,
+    so editing the dataset triggers a retrain while a fresh process skips it.
+    Writing a new entry removes the older ones (previous versions or
+    contents) for the same dataset.
+    """
+    with open(csv_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    cache_path = os.path.join(
+        cache_dir, f"env_model_{stem}_v{ENV_MODEL_CACHE_VERSION}_{digest}.pkl"
+    )
+
+    if os.path.exists(cache_path):
+        try:
+            return joblib.load(cache_path)
+        except Exception:
+            pass  # unreadable cache entry — retrain and overwrite it
+
+    result = train_env_model(csv_path, df=df)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        joblib.dump(result, cache_path, compress=3)
+    except OSError:
+        pass  # read-only deployment — keep the in-memory result only
+    else:
+        _prune_env_model_cache(cache_dir, stem, keep=cache_path)
+    return result
+
+
+def _prune_env_model_cache(cache_dir: str, stem: str, keep: str) -> None:
+    """
+    Delete env-model cache files for the dataset `stem` other than `keep`,
+    along with entries from before the dataset name was part of the key.
+    """
+    stale = re.compile(
+        rf"env_model_(?:{re.escape(stem)}_)?v\d+_[0-9a-f]{{64}}\.pkl"
+    )
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if stale.fullmatch(name) and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
 def predict_from_env(
     model,
     material: str,
@@ -394,7 +564,7 @@ def predict_from_env(
     features = mat_encoded + [
         temperature, pressure, ph, sulfur, flow_velocity, float(service_years),
     ]
-    X = np.array(features, dtype=np.float64).reshape(1, -1)
+    X = np.array(features, dtype=np.float32).reshape(1, -1)
     prediction = model.predict(X)
     return float(prediction[0])
 
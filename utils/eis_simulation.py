@@ -6,9 +6,36 @@ Extracted from the EIS data simulation Jupyter notebook.
 Author: Dulyawat Doonyapisut (charting9@gmail.com)
 """
 
+import cmath
+import importlib.util
+import io
+import math
+from collections import namedtuple
+from functools import lru_cache
+
 import numpy as np
 import scipy.io
 
+# Numba is optional — the NumPy path below is used when it is not installed
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+# CuPy is optional — enables sim_circuit(..., backend="cupy") on CUDA machines
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = True
+except ImportError:
+    cp = None
+    CUPY_AVAILABLE = False
+
 # =============================================================================
 # Essential Elements
 # =============================================================================
@@ -16,11 +43,19 @@ import scipy.io
 def F_range(initial_frequency, last_frequency, number_of_point=100):
     """
     Define frequency range in log scale.
+
+    The grid is memoised on its three scalars, so repeated calls return the
+    same (read-only) arrays.
     
     Returns:
         angular_frequency: log scale angular frequency [s^-1]
         frequency_Hz: log scale frequency [Hz]
     """
+    return _F_range_cached(float(initial_frequency), float(last_frequency), int(number_of_point))
+
+
+@lru_cache(maxsize=64)
+def _F_range_cached(initial_frequency, last_frequency, number_of_point):
     frequency_Hz = np.logspace(
         np.log10(initial_frequency),
         np.log10(last_frequency),
@@ -28,6 +63,9 @@ def F_range(initial_frequency, last_frequency, number_of_point=100):
         endpoint=True,
     )
     angular_frequency = 2 * np.pi * frequency_Hz
+    # Shared between callers via the cache — guard against in-place edits
+    frequency_Hz.setflags(write=False)
+    angular_frequency.setflags(write=False)
     return angular_frequency, frequency_Hz
 
 
@@ -52,51 +90,165 @@ def Z_W(sigma, angular_frequency):
     return (sigma * np.sqrt(2)) / np.sqrt(1j * angular_frequency)
 
 
+# Frequency-only factors shared by every spectrum: (jω)^α is evaluated as
+# exp(α·log jω) and the Warburg term divides by √(jω), so both transcendentals
+# per point are taken once per frequency instead of once per (spectrum, point)
+FreqCache = namedtuple("FreqCache", ["jw", "sqrt_jw", "log_jw"])
+
+
+def freq_cache(angular_frequency, xp=np):
+    """FreqCache (jω, √(jω), log jω) for an angular-frequency grid, on xp's device."""
+    jw = 1j * np.asarray(angular_frequency, dtype=np.float64)
+    return FreqCache(*(xp.asarray(a) for a in (jw, np.sqrt(jw), np.log(jw))))
+
+
 # =============================================================================
 # Random generators
 # =============================================================================
 
 def log_rand(initial_gen, last_gen, size_number):
     """Random values in log space."""
-    initial_v = np.log(initial_gen)
-    last_v = np.log(last_gen)
-    return np.exp(initial_v + (last_v - initial_v) * np.random.rand(size_number))
+    return _log_map(initial_gen, last_gen, np.random.rand(size_number))
 
 
 def lin_rand(initial_gen, last_gen, size_number):
     """Random values in linear space."""
-    return initial_gen + (last_gen - initial_gen) * np.random.rand(size_number)
+    return _lin_map(initial_gen, last_gen, np.random.rand(size_number))
+
+
+def _log_map(initial_gen, last_gen, u):
+    """Map uniform [0, 1) samples u onto [initial_gen, last_gen) in log space."""
+    initial_v = np.log(initial_gen)
+    last_v = np.log(last_gen)
+    return np.exp(initial_v + (last_v - initial_v) * u)
+
+
+def _lin_map(initial_gen, last_gen, u):
+    """Map uniform [0, 1) samples u onto [initial_gen, last_gen) linearly."""
+    return initial_gen + (last_gen - initial_gen) * u
 
 
 # =============================================================================
 # Array generators
 # =============================================================================
 
-def genZR(size_number, number_of_point, resistance):
-    """Generate resistance impedance array."""
-    ZR = np.zeros((size_number, number_of_point), dtype=complex)
-    for idx in range(size_number):
-        for idx2 in range(number_of_point):
-            ZR[idx][idx2] = Z_R(resistance[idx])
+# dtype is the complex dtype of the result; complex64 runs the arithmetic in
+# float32 as well. R, Q, σ and ω stay far inside the float32 exponent range.
+
+def genZR(size_number, number_of_point, resistance, xp=np, dtype=complex):
+    """Generate resistance impedance array (xp: array module, np or cupy)."""
+    ZR = xp.empty((size_number, number_of_point), dtype=dtype)
+    ZR[:] = Z_R(xp.asarray(resistance))[:, None]
     return ZR
 
 
-def genZQ(size_number, number_of_point, non_ideal_capacitance, ideality_factor, angular_frequency):
-    """Generate CPE impedance array."""
-    ZQ = np.zeros((size_number, number_of_point), dtype=complex)
-    for idx in range(size_number):
-        for idx2 in range(number_of_point):
-            ZQ[idx][idx2] = Z_Q(non_ideal_capacitance[idx], ideality_factor[idx], angular_frequency[idx2])
-    return ZQ
+def genZQ(size_number, number_of_point, non_ideal_capacitance, ideality_factor, angular_frequency, fc=None, xp=np, dtype=complex):
+    """Generate CPE impedance array (fc: optional precomputed FreqCache)."""
+    if fc is None:
+        fc = freq_cache(angular_frequency)
+    real = np.finfo(dtype).dtype
+    return 1 / (
+        xp.asarray(non_ideal_capacitance, dtype=real)[:, None]
+        * xp.exp(xp.asarray(ideality_factor, dtype=real)[:, None] * xp.asarray(fc.log_jw, dtype=dtype)[None, :])
+    )
+
 
+def genZW(size_number, number_of_point, sigma, angular_frequency, fc=None, xp=np, dtype=complex):
+    """Generate Warburg impedance array (fc: optional precomputed FreqCache)."""
+    if fc is None:
+        fc = freq_cache(angular_frequency)
+    real = np.finfo(dtype).dtype
+    return (xp.asarray(sigma, dtype=real)[:, None] * math.sqrt(2)) / xp.asarray(fc.sqrt_jw, dtype=dtype)[None, :]
 
-def genZW(size_number, number_of_point, sigma, angular_frequency):
-    """Generate Warburg impedance array."""
-    ZW = np.zeros((size_number, number_of_point), dtype=complex)
-    for idx in range(size_number):
-        for idx2 in range(number_of_point):
-            ZW[idx][idx2] = Z_W(sigma[idx], angular_frequency[idx2])
-    return ZW
+
+def _parallel_into(a, b, xp=np):
+    """
+    a ∥ b = 1 / (1/a + 1/b), computed in place in a (b is used as scratch),
+    so combining impedances allocates no new (size_number, number_of_point) arrays.
+    """
+    xp.reciprocal(a, out=a)
+    xp.reciprocal(b, out=b)
+    a += b
+    return xp.reciprocal(a, out=a)
+
+
+def _array_module(backend):
+    """Array module for a sim_circuit backend name."""
+    if backend == "numpy":
+        return np
+    if backend == "cupy":
+        if not CUPY_AVAILABLE:
+            raise ValueError(
+                "backend='cupy' requires CuPy. Install it with: pip install cupy-cuda12x"
+            )
+        return cp
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+# =============================================================================
+# Compiled circuit kernels
+# =============================================================================
+# Each kernel fills a preallocated Zsum (size_number, number_of_point) in one
+# fused pass per spectrum, instead of building the intermediate ZR/ZQ/ZW arrays.
+# Frequency factors come from a FreqCache (log jω, √(jω)).
+# The kernels are serial: Streamlit calls them from one script thread per
+# session, and Numba's parallel threading layers are not safe to enter from
+# several threads (workqueue aborts, TBB hangs at exit). At the UI sizes
+# (≤ 512 × 200) parallel=True gained nothing anyway.
+
+@njit(fastmath=True, cache=True)
+def _cir1_kernel(log_jw, R1, R2, a1, Q1, Zsum):
+    for s in range(Zsum.shape[0]):
+        for k in range(Zsum.shape[1]):
+            zq1 = 1.0 / (Q1[s] * cmath.exp(a1[s] * log_jw[k]))
+            Zsum[s, k] = R1[s] + 1.0 / (1.0 / R2[s] + 1.0 / zq1)
+
+
+@njit(fastmath=True, cache=True)
+def _cir2_kernel(log_jw, R1, R2, R3, a1, Q1, a2, Q2, Zsum):
+    for s in range(Zsum.shape[0]):
+        for k in range(Zsum.shape[1]):
+            zq1 = 1.0 / (Q1[s] * cmath.exp(a1[s] * log_jw[k]))
+            zq2 = 1.0 / (Q2[s] * cmath.exp(a2[s] * log_jw[k]))
+            Zsum[s, k] = (
+                R1[s]
+                + 1.0 / (1.0 / R2[s] + 1.0 / zq1)
+                + 1.0 / (1.0 / R3[s] + 1.0 / zq2)
+            )
+
+
+@njit(fastmath=True, cache=True)
+def _cir3_kernel(log_jw, sqrt_jw, R1, R2, a1, Q1, sigma, Zsum):
+    for s in range(Zsum.shape[0]):
+        for k in range(Zsum.shape[1]):
+            zq1 = 1.0 / (Q1[s] * cmath.exp(a1[s] * log_jw[k]))
+            zw = (sigma[s] * np.sqrt(2.0)) / sqrt_jw[k]
+            Zsum[s, k] = R1[s] + 1.0 / (1.0 / zq1 + 1.0 / (R2[s] + zw))
+
+
+@njit(fastmath=True, cache=True)
+def _cir4_kernel(log_jw, sqrt_jw, R1, R2, R3, a1, Q1, a2, Q2, sigma, Zsum):
+    for s in range(Zsum.shape[0]):
+        for k in range(Zsum.shape[1]):
+            zq1 = 1.0 / (Q1[s] * cmath.exp(a1[s] * log_jw[k]))
+            zq2 = 1.0 / (Q2[s] * cmath.exp(a2[s] * log_jw[k]))
+            zw = (sigma[s] * np.sqrt(2.0)) / sqrt_jw[k]
+            Zsum[s, k] = (
+                R1[s]
+                + 1.0 / (1.0 / R2[s] + 1.0 / zq1)
+                + 1.0 / (1.0 / zq2 + 1.0 / (R3[s] + zw))
+            )
+
+
+@njit(fastmath=True, cache=True)
+def _cir5_kernel(log_jw, sqrt_jw, R1, R2, R3, a1, Q1, a2, Q2, sigma, Zsum):
+    for s in range(Zsum.shape[0]):
+        for k in range(Zsum.shape[1]):
+            zq1 = 1.0 / (Q1[s] * cmath.exp(a1[s] * log_jw[k]))
+            zq2 = 1.0 / (Q2[s] * cmath.exp(a2[s] * log_jw[k]))
+            zw = (sigma[s] * np.sqrt(2.0)) / sqrt_jw[k]
+            inner = R2[s] + 1.0 / (1.0 / (R3[s] + zw) + 1.0 / zq2)
+            Zsum[s, k] = R1[s] + 1.0 / (1.0 / inner + 1.0 / zq1)
 
 
 # =============================================================================
@@ -133,6 +285,29 @@ CIRCUIT_INFO = {
 }
 
 
+# matplotlib is optional — only needed to pre-render circuit equations for the UI
+MATHTEXT_AVAILABLE = importlib.util.find_spec("matplotlib") is not None
+
+
+def equation_svg(latex, size=22, color="#e8edf5"):
+    """
+    Render a mathtext expression to an SVG string (no client-side TeX).
+
+    The figure background is transparent, so the equation sits directly on
+    the page's dark theme instead of a white box.
+    """
+    import matplotlib
+    from matplotlib import mathtext
+    from matplotlib.font_manager import FontProperties
+
+    buf = io.BytesIO()
+    with matplotlib.rc_context({"savefig.transparent": True}):
+        mathtext.math_to_image(
+            f"${latex}$", buf, prop=FontProperties(size=size), format="svg", color=color,
+        )
+    return buf.getvalue().decode("utf-8")
+
+
 def sim_circuit(
     circuit_id,
     size_number,
@@ -142,156 +317,239 @@ def sim_circuit(
     alpha_range,
     q_range,
     sigma_range,
+    dtype=np.complex64,
+    seed=None,
+    backend="numpy",
 ):
     """
     Simulate a specific circuit.
+
+    Args:
+        dtype: complex dtype of the returned Zsum (complex64 by default;
+            pass np.complex128 for full double precision)
+        seed: seed for the PCG64 generator all parameters are drawn from;
+            the same seed and inputs always produce the same spectra
+            (None draws fresh entropy). NumPy's global RNG is not touched.
+        backend: "numpy" (compiled kernels when Numba is installed) or
+            "cupy" to evaluate the (size_number, number_of_point) arithmetic
+            on the GPU; parameters are still drawn on the host, so both
+            backends give the same spectra for the same seed
     
     Returns:
         Zsum: complex impedance array (size_number, number_of_point)
         Zparam: parameter array
     """
+    rng = np.random.default_rng(seed)
+    xp = _array_module(backend)
+
     if circuit_id == 1:
-        return _sim_cir1(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range)
+        Zsum, Zparam = _sim_cir1(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, rng, xp, dtype)
     elif circuit_id == 2:
-        return _sim_cir2(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range)
+        Zsum, Zparam = _sim_cir2(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, rng, xp, dtype)
     elif circuit_id == 3:
-        return _sim_cir3(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range)
+        Zsum, Zparam = _sim_cir3(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range, rng, xp, dtype)
     elif circuit_id == 4:
-        return _sim_cir4(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range)
+        Zsum, Zparam = _sim_cir4(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range, rng, xp, dtype)
     elif circuit_id == 5:
-        return _sim_cir5(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range)
+        Zsum, Zparam = _sim_cir5(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range, rng, xp, dtype)
     else:
         raise ValueError(f"Unknown circuit_id: {circuit_id}")
 
+    Zsum = Zsum.astype(dtype, copy=False)
+    if xp is not np:
+        # Only the final spectra cross back to the host
+        Zsum = xp.asnumpy(Zsum)
+    return Zsum, Zparam
 
-def _sim_cir1(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range):
-    R1 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr1 = genZR(size_number, number_of_point, R1)
-
-    R2 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr2 = genZR(size_number, number_of_point, R2)
-
-    ideality_factor1 = np.round(lin_rand(alpha_range[0], alpha_range[1], size_number), 3)
-    Q1 = log_rand(q_range[0], q_range[1], size_number)
-    Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency)
-
-    Zsum = Zr1 + 1 / (1 / Zr2 + 1 / Zq1)
-
-    Zparam = []
-    for idx in range(size_number):
-        Zparam.append([R1[idx], R2[idx], ideality_factor1[idx], Q1[idx]])
 
-    return Zsum, np.array(Zparam)
+def _sim_cir1(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, rng, xp=np, dtype=complex):
+    u = rng.random((4, size_number))
+    R1 = _log_map(resistance_range[0], resistance_range[1], u[0])
+    R2 = _log_map(resistance_range[0], resistance_range[1], u[1])
+    ideality_factor1 = np.round(_lin_map(alpha_range[0], alpha_range[1], u[2]), 3)
+    Q1 = _log_map(q_range[0], q_range[1], u[3])
+    fc = freq_cache(angular_frequency, xp)
 
+    if NUMBA_AVAILABLE and xp is np:
+        Zsum = np.empty((size_number, number_of_point), dtype=dtype)
+        _cir1_kernel(fc.log_jw, R1, R2, ideality_factor1, Q1, Zsum)
+    else:
+        Zr1 = genZR(size_number, number_of_point, R1, xp=xp, dtype=dtype)
+        Zr2 = genZR(size_number, number_of_point, R2, xp=xp, dtype=dtype)
+        Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zsum = Zr1
+        Zsum += _parallel_into(Zr2, Zq1, xp)
+
+    Zparam = np.column_stack([R1, R2, ideality_factor1, Q1])
+
+    return Zsum, Zparam
+
+
+def _sim_cir2(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, rng, xp=np, dtype=complex):
+    u = rng.random((7, size_number))
+    R1 = _log_map(resistance_range[0], resistance_range[1], u[0])
+    R2 = _log_map(resistance_range[0], resistance_range[1], u[1])
+    ideality_factor1 = np.round(_lin_map(alpha_range[0], alpha_range[1], u[2]), 3)
+    Q1 = _log_map(q_range[0], q_range[1], u[3])
+    R3 = _log_map(resistance_range[0], resistance_range[1], u[4])
+    ideality_factor2 = np.round(_lin_map(alpha_range[0], alpha_range[1], u[5]), 3)
+    Q2 = _log_map(q_range[0], q_range[1], u[6])
+    fc = freq_cache(angular_frequency, xp)
+
+    if NUMBA_AVAILABLE and xp is np:
+        Zsum = np.empty((size_number, number_of_point), dtype=dtype)
+        _cir2_kernel(
+            fc.log_jw, R1, R2, R3,
+            ideality_factor1, Q1, ideality_factor1, Q2, Zsum,
+        )
+    else:
+        Zr1 = genZR(size_number, number_of_point, R1, xp=xp, dtype=dtype)
+        Zr2 = genZR(size_number, number_of_point, R2, xp=xp, dtype=dtype)
+        Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zr3 = genZR(size_number, number_of_point, R3, xp=xp, dtype=dtype)
+        Zq2 = genZQ(size_number, number_of_point, Q2, ideality_factor1, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zsum = Zr1
+        Zsum += _parallel_into(Zr2, Zq1, xp)
+        Zsum += _parallel_into(Zr3, Zq2, xp)
+
+    Zparam = np.column_stack([R1, R2, R3, ideality_factor1, Q1, ideality_factor2, Q2])
+
+    return Zsum, Zparam
+
+
+def _sim_cir3(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range, rng, xp=np, dtype=complex):
+    u = rng.random((5, size_number))
+    R1 = _log_map(resistance_range[0], resistance_range[1], u[0])
+    ideality_factor1 = np.round(_lin_map(alpha_range[0], alpha_range[1], u[1]), 3)
+    Q1 = _log_map(q_range[0], q_range[1], u[2])
+    R2 = _log_map(resistance_range[0], resistance_range[1], u[3])
+    sigma = _log_map(sigma_range[0], sigma_range[1], u[4])
+    fc = freq_cache(angular_frequency, xp)
+
+    if NUMBA_AVAILABLE and xp is np:
+        Zsum = np.empty((size_number, number_of_point), dtype=dtype)
+        _cir3_kernel(fc.log_jw, fc.sqrt_jw, R1, R2, ideality_factor1, Q1, sigma, Zsum)
+    else:
+        Zr1 = genZR(size_number, number_of_point, R1, xp=xp, dtype=dtype)
+        Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zr2 = genZR(size_number, number_of_point, R2, xp=xp, dtype=dtype)
+        Zw = genZW(size_number, number_of_point, sigma, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zr2 += Zw
+        Zsum = Zr1
+        Zsum += _parallel_into(Zq1, Zr2, xp)
+
+    Zparam = np.column_stack([R1, R2, ideality_factor1, Q1, sigma])
+
+    return Zsum, Zparam
+
+
+def _sim_cir4(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range, rng, xp=np, dtype=complex):
+    u = rng.random((8, size_number))
+    R1 = _log_map(resistance_range[0], resistance_range[1], u[0])
+    R2 = _log_map(resistance_range[0], resistance_range[1], u[1])
+    ideality_factor1 = np.round(_lin_map(alpha_range[0], alpha_range[1], u[2]), 3)
+    Q1 = _log_map(q_range[0], q_range[1], u[3])
+    ideality_factor2 = np.round(_lin_map(alpha_range[0], alpha_range[1], u[4]), 3)
+    Q2 = _log_map(q_range[0], q_range[1], u[5])
+    R3 = _log_map(resistance_range[0], resistance_range[1], u[6])
+    sigma = _log_map(sigma_range[0], sigma_range[1], u[7])
+    fc = freq_cache(angular_frequency, xp)
+
+    if NUMBA_AVAILABLE and xp is np:
+        Zsum = np.empty((size_number, number_of_point), dtype=dtype)
+        _cir4_kernel(
+            fc.log_jw, fc.sqrt_jw, R1, R2, R3,
+            ideality_factor1, Q1, ideality_factor1, Q2, sigma, Zsum,
+        )
+    else:
+        Zr1 = genZR(size_number, number_of_point, R1, xp=xp, dtype=dtype)
+        Zr2 = genZR(size_number, number_of_point, R2, xp=xp, dtype=dtype)
+        Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zq2 = genZQ(size_number, number_of_point, Q2, ideality_factor1, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zr3 = genZR(size_number, number_of_point, R3, xp=xp, dtype=dtype)
+        Zw = genZW(size_number, number_of_point, sigma, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zr3 += Zw
+        Zsum = Zr1
+        Zsum += _parallel_into(Zr2, Zq1, xp)
+        Zsum += _parallel_into(Zq2, Zr3, xp)
+
+    Zparam = np.column_stack([R1, R2, R3, ideality_factor1, Q1, ideality_factor2, Q2, sigma])
+
+    return Zsum, Zparam
+
+
+def _sim_cir5(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range, rng, xp=np, dtype=complex):
+    u = rng.random((8, size_number))
+    R1 = _log_map(resistance_range[0], resistance_range[1], u[0])
+    R2 = _log_map(resistance_range[0], resistance_range[1], u[1])
+    ideality_factor1 = np.round(_lin_map(alpha_range[0], alpha_range[1], u[2]), 3)
+    Q1 = _log_map(q_range[0], q_range[1], u[3])
+    R3 = _log_map(resistance_range[0], resistance_range[1], u[4])
+    ideality_factor2 = np.round(_lin_map(alpha_range[0], alpha_range[1], u[5]), 3)
+    Q2 = _log_map(q_range[0], q_range[1], u[6])
+    sigma = _log_map(sigma_range[0], sigma_range[1], u[7])
+    fc = freq_cache(angular_frequency, xp)
+
+    if NUMBA_AVAILABLE and xp is np:
+        Zsum = np.empty((size_number, number_of_point), dtype=dtype)
+        _cir5_kernel(
+            fc.log_jw, fc.sqrt_jw, R1, R2, R3,
+            ideality_factor1, Q1, ideality_factor1, Q2, sigma, Zsum,
+        )
+    else:
+        Zr1 = genZR(size_number, number_of_point, R1, xp=xp, dtype=dtype)
+        Zr2 = genZR(size_number, number_of_point, R2, xp=xp, dtype=dtype)
+        Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zr3 = genZR(size_number, number_of_point, R3, xp=xp, dtype=dtype)
+        Zq2 = genZQ(size_number, number_of_point, Q2, ideality_factor1, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zw = genZW(size_number, number_of_point, sigma, angular_frequency, fc=fc, xp=xp, dtype=dtype)
+        Zr3 += Zw
+        Zr2 += _parallel_into(Zr3, Zq2, xp)
+        Zsum = Zr1
+        Zsum += _parallel_into(Zr2, Zq1, xp)
 
-def _sim_cir2(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range):
-    R1 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr1 = genZR(size_number, number_of_point, R1)
-
-    R2 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr2 = genZR(size_number, number_of_point, R2)
-
-    ideality_factor1 = np.round(lin_rand(alpha_range[0], alpha_range[1], size_number), 3)
-    Q1 = log_rand(q_range[0], q_range[1], size_number)
-    Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency)
-
-    R3 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr3 = genZR(size_number, number_of_point, R3)
-
-    ideality_factor2 = np.round(lin_rand(alpha_range[0], alpha_range[1], size_number), 3)
-    Q2 = log_rand(q_range[0], q_range[1], size_number)
-    Zq2 = genZQ(size_number, number_of_point, Q2, ideality_factor1, angular_frequency)
-
-    Zsum = Zr1 + 1 / (1 / Zr2 + 1 / Zq1) + 1 / (1 / Zr3 + 1 / Zq2)
-
-    Zparam = []
-    for idx in range(size_number):
-        Zparam.append([R1[idx], R2[idx], R3[idx], ideality_factor1[idx], Q1[idx], ideality_factor2[idx], Q2[idx]])
-
-    return Zsum, np.array(Zparam)
-
-
-def _sim_cir3(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range):
-    R1 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr1 = genZR(size_number, number_of_point, R1)
-
-    ideality_factor1 = np.round(lin_rand(alpha_range[0], alpha_range[1], size_number), 3)
-    Q1 = log_rand(q_range[0], q_range[1], size_number)
-    Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency)
-
-    R2 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr2 = genZR(size_number, number_of_point, R2)
-
-    sigma = log_rand(sigma_range[0], sigma_range[1], size_number)
-    Zw = genZW(size_number, number_of_point, sigma, angular_frequency)
-
-    Zsum = Zr1 + 1 / (1 / Zq1 + 1 / (Zr2 + Zw))
-
-    Zparam = []
-    for idx in range(size_number):
-        Zparam.append([R1[idx], R2[idx], ideality_factor1[idx], Q1[idx], sigma[idx]])
-
-    return Zsum, np.array(Zparam)
-
-
-def _sim_cir4(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range):
-    R1 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr1 = genZR(size_number, number_of_point, R1)
-
-    R2 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr2 = genZR(size_number, number_of_point, R2)
-
-    ideality_factor1 = np.round(lin_rand(alpha_range[0], alpha_range[1], size_number), 3)
-    Q1 = log_rand(q_range[0], q_range[1], size_number)
-    Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency)
-
-    ideality_factor2 = np.round(lin_rand(alpha_range[0], alpha_range[1], size_number), 3)
-    Q2 = log_rand(q_range[0], q_range[1], size_number)
-    Zq2 = genZQ(size_number, number_of_point, Q2, ideality_factor1, angular_frequency)
-
-    R3 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr3 = genZR(size_number, number_of_point, R3)
-
-    sigma = log_rand(sigma_range[0], sigma_range[1], size_number)
-    Zw = genZW(size_number, number_of_point, sigma, angular_frequency)
-
-    Zsum = Zr1 + 1 / (1 / Zr2 + 1 / Zq1) + 1 / (1 / Zq2 + 1 / (Zr3 + Zw))
-
-    Zparam = []
-    for idx in range(size_number):
-        Zparam.append([R1[idx], R2[idx], R3[idx], ideality_factor1[idx], Q1[idx], ideality_factor2[idx], Q2[idx], sigma[idx]])
-
-    return Zsum, np.array(Zparam)
-
-
-def _sim_cir5(size_number, number_of_point, angular_frequency, resistance_range, alpha_range, q_range, sigma_range):
-    R1 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr1 = genZR(size_number, number_of_point, R1)
-
-    R2 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr2 = genZR(size_number, number_of_point, R2)
+    Zparam = np.column_stack([R1, R2, R3, ideality_factor1, Q1, ideality_factor2, Q2, sigma])
 
-    ideality_factor1 = np.round(lin_rand(alpha_range[0], alpha_range[1], size_number), 3)
-    Q1 = log_rand(q_range[0], q_range[1], size_number)
-    Zq1 = genZQ(size_number, number_of_point, Q1, ideality_factor1, angular_frequency)
+    return Zsum, Zparam
 
-    R3 = log_rand(resistance_range[0], resistance_range[1], size_number)
-    Zr3 = genZR(size_number, number_of_point, R3)
 
-    ideality_factor2 = np.round(lin_rand(alpha_range[0], alpha_range[1], size_number), 3)
-    Q2 = log_rand(q_range[0], q_range[1], size_number)
-    Zq2 = genZQ(size_number, number_of_point, Q2, ideality_factor1, angular_frequency)
+# =============================================================================
+# Plotting planes
+# =============================================================================
 
-    sigma = log_rand(sigma_range[0], sigma_range[1], size_number)
-    Zw = genZW(size_number, number_of_point, sigma, angular_frequency)
+@njit(fastmath=True, cache=True)
+def _planes_kernel(Zsum, real, negimag, phase, mag):
+    for s in range(Zsum.shape[0]):
+        for k in range(Zsum.shape[1]):
+            z = Zsum[s, k]
+            real[s, k] = z.real
+            negimag[s, k] = -z.imag
+            phase[s, k] = math.degrees(math.atan2(z.imag, z.real))
+            mag[s, k] = math.hypot(z.real, z.imag)
 
-    Zsum = Zr1 + 1 / (1 / (Zr2 + 1 / ((1 / (Zr3 + Zw)) + 1 / Zq2)) + 1 / Zq1)
 
-    Zparam = []
-    for idx in range(size_number):
-        Zparam.append([R1[idx], R2[idx], R3[idx], ideality_factor1[idx], Q1[idx], ideality_factor2[idx], Q2[idx], sigma[idx]])
+def impedance_planes(Zsum):
+    """
+    Split simulated spectra into the contiguous real arrays the plots use,
+    in one pass over the complex data.
 
-    return Zsum, np.array(Zparam)
+    Returns:
+        real, negimag, phase, mag: Z', -Z'', phase [deg] and |Z|, each shaped
+        like Zsum (float32 for complex64 input)
+    """
+    Zsum = np.ascontiguousarray(Zsum)
+    if NUMBA_AVAILABLE:
+        real, negimag, phase, mag = np.empty((4,) + Zsum.shape, dtype=Zsum.real.dtype)
+        _planes_kernel(Zsum, real, negimag, phase, mag)
+        return real, negimag, phase, mag
+    # Zero-copy (real, imag) view of the interleaved complex buffer
+    ri = Zsum.view(Zsum.real.dtype).reshape(Zsum.shape + (2,))
+    return (
+        np.ascontiguousarray(ri[..., 0]),
+        np.negative(ri[..., 1], order="C"),
+        np.degrees(np.arctan2(ri[..., 1], ri[..., 0])),
+        np.absolute(Zsum),
+    )
 
 
 # =============================================================================
@@ -300,19 +558,14 @@ def _sim_cir5(size_number, number_of_point, angular_frequency, resistance_range,
 
 def arrange_data(Circuit, cir_class, size_number, number_of_point):
     """Arrange a single circuit's data into feature arrays."""
-    imge = Circuit.imag
-    phase = np.degrees(np.arctan(Circuit.imag / Circuit.real))
-    mag = np.absolute(Circuit)
-
-    x = np.zeros((size_number, 3, number_of_point))
-    y = np.zeros(size_number)
-
-    for idx in range(size_number):
-        y[idx] = cir_class
-        for idx2 in range(number_of_point):
-            x[idx][0][idx2] = imge[idx][idx2]
-            x[idx][1][idx2] = phase[idx][idx2]
-            x[idx][2][idx2] = mag[idx][idx2]
+    # Channels written as whole (size_number, number_of_point) planes. Phase
+    # uses atan2 (np.angle): no imag/real quotient, no divide-by-zero at
+    # Re Z = 0, and the correct quadrant if Re Z < 0
+    x = np.empty((size_number, 3, number_of_point))
+    x[:, 0] = Circuit.imag
+    x[:, 1] = np.angle(Circuit, deg=True)
+    np.absolute(Circuit, out=x[:, 2])
+    y = np.full(size_number, cir_class, dtype=np.float64)
 
     return x, y
 
@@ -325,13 +578,8 @@ def export_data(Circuit, size_number, number_of_point, numc):
     for idx in range(numc):
         x[idx], y[idx] = arrange_data(Circuit[idx], idx, size_number, number_of_point)
 
-    x_data = x[0]
-    y_data = y[0]
-
-    for idx in range(numc - 1):
-        x_data = np.append(x_data, x[idx + 1], axis=0)
-
-    for idx in range(numc - 1):
-        y_data = np.append(y_data, y[idx + 1], axis=0)
+    # x and y are contiguous, so circuits-then-spectra order is a free reshape
+    x_data = x.reshape(numc * size_number, 3, number_of_point)
+    y_data = y.reshape(numc * size_number)
 
     return x_data, y_data
@@ -6,26 +6,183 @@ Extracted from the regression model Jupyter notebook.
 Author: Dulyawat Doonyapisut (charting9@gmail.com)
 """
 
+import importlib.util
+import os
+import sys
+import weakref
+
 import numpy as np
 import scipy.io
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_absolute_error, mean_absolute_percentage_error, mean_squared_error
 
-# TensorFlow is optional — may not be available on all Python versions
+# TensorFlow is optional — may not be available on all Python versions. It is
+# imported on first use by the Keras helpers (_require_tf), so importing this
+# module for the .mat / boosting helpers doesn't pay TF's multi-second start-up
+TF_AVAILABLE = importlib.util.find_spec("tensorflow") is not None
+tf = None
+keras = None
+
+
+def _require_tf():
+    """Import TensorFlow on first call and return (tf, keras)."""
+    global tf, keras
+    if tf is None:
+        if not TF_AVAILABLE:
+            raise ValueError("TensorFlow is not installed; install it to use the Keras model.")
+        import tensorflow
+        # TF32 tensor-core GEMMs/convs on Ampere+ GPUs (on by default since
+        # TF 2.12; set explicitly so an older default can't turn it off)
+        tensorflow.config.experimental.enable_tensor_float_32_execution(True)
+        tf, keras = tensorflow, tensorflow.keras
+    return tf, keras
+
+
+def configure_tf_threads(inter_op_threads=2):
+    """
+    Cap TensorFlow's inter-op thread pool (the intra-op pool keeps TF's
+    default of all cores). The Conv1D stack is a straight chain of ops, so
+    more inter-op threads only oversubscribe the cores.
+
+    Only takes effect before the TF runtime starts (make_model calls it
+    first thing); returns False if the runtime was already running.
+    """
+    _require_tf()
+    try:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError:
+        return False
+    return True
+
+
+def _is_keras_model(model):
+    """True for a Keras model, without importing TF when it isn't loaded yet."""
+    return "tensorflow" in sys.modules and isinstance(model, _require_tf()[1].Model)
+
+
+# XGBoost is optional — used as the boosting backend when installed
 try:
-    import tensorflow as tf
-    from tensorflow import keras
-    TF_AVAILABLE = True
+    from xgboost import XGBRegressor
+    XGB_AVAILABLE = True
 except ImportError:
-    TF_AVAILABLE = False
-    tf = None
-    keras = None
+    XGB_AVAILABLE = False
+    XGBRegressor = None
+
+# LightGBM is optional — second-choice boosting backend when XGBoost is absent
+try:
+    from lightgbm import LGBMRegressor
+    LGBM_AVAILABLE = True
+except ImportError:
+    LGBM_AVAILABLE = False
+    LGBMRegressor = None
+
+# LiteRT is optional — standalone TFLite runtime for evaluate_model_tflite;
+# falls back to tf.lite.Interpreter (deprecated in recent TF releases)
+try:
+    from ai_edge_litert.interpreter import Interpreter as LiteRTInterpreter
+    LITERT_AVAILABLE = True
+except ImportError:
+    LITERT_AVAILABLE = False
+    LiteRTInterpreter = None
+
+# h5py is optional — only needed for MATLAB v7.3 (HDF5) .mat files
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+    h5py = None
+
+# LZ4 is optional — fast joblib compression for model downloads
+try:
+    import lz4  # noqa: F401
+    MODEL_COMPRESSION = ("lz4", 3)
+except ImportError:
+    MODEL_COMPRESSION = ("zlib", 3)
 
 
 # Parameter names for Circuit 4 regression output
 PARAM_NAMES = ["Rs", "R1", "R2", "Q1", "Q2", "Sigma"]
 
 
+def load_mat_arrays(file_path_or_buffer, variable_names):
+    """
+    Read only the named arrays from a .mat file.
+
+    MATLAB v7.3 files are HDF5 containers that scipy cannot parse; those are
+    read with h5py instead, one bulk read per variable, transposed back from
+    MATLAB's column-major layout. Missing variables are simply absent from
+    the returned dict.
+    """
+    try:
+        return scipy.io.loadmat(file_path_or_buffer, variable_names=variable_names)
+    except NotImplementedError:
+        if not H5PY_AVAILABLE:
+            raise ValueError(
+                "This .mat file is MATLAB v7.3 (HDF5); install h5py to read it."
+            )
+    if hasattr(file_path_or_buffer, "seek"):
+        file_path_or_buffer.seek(0)
+    with h5py.File(file_path_or_buffer, "r") as f:
+        return {name: f[name][()].T for name in variable_names if name in f}
+
+
+def load_mat_sample(file_path_or_buffer, variable_name, index=0):
+    """
+    Read a single sample (first-axis row) of one array from a .mat file.
+
+    For MATLAB v7.3 (HDF5) files only that row is read from disk: the
+    dataset is column-major, so the row is its last-axis slice, transposed
+    back. MAT-5 files cannot be read partially and go through
+    load_mat_arrays. Raises KeyError if the variable is missing.
+    """
+    try:
+        return scipy.io.loadmat(file_path_or_buffer, variable_names=[variable_name])[variable_name][index]
+    except NotImplementedError:
+        if not H5PY_AVAILABLE:
+            raise ValueError(
+                "This .mat file is MATLAB v7.3 (HDF5); install h5py to read it."
+            )
+    if hasattr(file_path_or_buffer, "seek"):
+        file_path_or_buffer.seek(0)
+    with h5py.File(file_path_or_buffer, "r") as f:
+        return f[variable_name][..., index].T
+
+
+def save_mat_arrays(file, arrays):
+    """
+    Write arrays to a .mat file.
+
+    With h5py installed this is a MATLAB v7.3 (HDF5) file: 512-byte MAT
+    header in the user block, arrays stored transposed to MATLAB's
+    column-major layout, gzip + shuffle compressed in chunks. That is
+    smaller and quicker to write than compressed MAT-5 for float spectra,
+    and has no 2 GB limit. Without h5py it falls back to scipy's MAT-5
+    writer. Either format reads back through load_mat_arrays.
+    """
+    if not H5PY_AVAILABLE:
+        scipy.io.savemat(file, arrays, do_compression=True)
+        return
+    start = file.tell() if hasattr(file, "tell") else 0
+    with h5py.File(file, "w", userblock_size=512) as f:
+        for name, arr in arrays.items():
+            arr = np.asarray(arr)
+            dset = f.create_dataset(
+                name, data=arr.T, chunks=True, compression="gzip", shuffle=True,
+            )
+            dset.attrs["MATLAB_class"] = np.bytes_(
+                "single" if arr.dtype == np.float32 else "double"
+            )
+    header = b"MATLAB 7.3 MAT-file, Platform: GLNXA64, Created by: EIS Analyzer HDF5 schema 1.00 ."
+    header = header.ljust(116) + b"\x00" * 8 + b"\x00\x02IM"
+    if hasattr(file, "seek"):
+        file.seek(start)
+        file.write(header)
+    else:
+        with open(file, "r+b") as fh:
+            fh.write(header)
+
+
 def load_and_preprocess_data(file_path_or_buffer, test_size=0.2, random_state=42, is_test=False):
     """
     Load .mat file and preprocess EIS data for the regression model.
@@ -39,7 +196,7 @@ def load_and_preprocess_data(file_path_or_buffer, test_size=0.2, random_state=42
     Returns:
         x_train, x_test, y_train, y_test
     """
-    mat = scipy.io.loadmat(file_path_or_buffer)
+    mat = load_mat_arrays(file_path_or_buffer, ["x_data", "y_data"])
     x = mat["x_data"]
     y = mat["y_data"]
 
@@ -60,11 +217,13 @@ def load_and_preprocess_data(file_path_or_buffer, test_size=0.2, random_state=42
 
     n_input_channels = x.shape[-1]
 
-    # Augmentation: add negated channels
+    # Augmentation: add negated channels, written straight into float32 (the
+    # dtype Conv1D and the boosting models consume) so no later cast pass
     new_shape = list(x.shape)
     new_shape[-1] = n_input_channels * 2
-    new_x = np.zeros(new_shape)
+    new_x = np.empty(new_shape, dtype=np.float32)
     new_x[:, :, :n_input_channels] = x
+    np.negative(x, out=new_x[:, :, n_input_channels:])
 
     n_ycols = y.shape[1]
 
@@ -73,23 +232,15 @@ def load_and_preprocess_data(file_path_or_buffer, test_size=0.2, random_state=42
     # and 6 or 8 columns for the test path, but .mat files from the simulator
     # may already have the reduced 6-column layout.
     if n_ycols >= 7:
-        # Full 8-column layout: cols 3,5 = alpha; cols 4,6 = Q
-        if is_test:
-            y[:, 4] = y[:, 4] * 10**6
-            y[:, 6] = y[:, 6] * 10**6
-        else:
-            y[:, 3] = y[:, 3] * 10**4
-            y[:, 4] = y[:, 4] * 10**7
-            y[:, 5] = y[:, 5] * 10**4
-            y[:, 6] = y[:, 6] * 10**7
-        # Remove alpha columns (indices 3 and 5)
-        y = np.delete(y, [3, 5], axis=1)
+        # Full 8-column layout: cols 3,5 = alpha; cols 4,6 = Q.
+        # Drop the alpha columns and scale Q in one gather + multiply
+        keep = [c for c in range(n_ycols) if c not in (3, 5)]
+        q_scale = 10**6 if is_test else 10**7
+        scale = np.ones(len(keep), dtype=y.dtype if y.dtype.kind == "f" else np.float64)
+        scale[[keep.index(4), keep.index(6)]] = q_scale
+        y = y[:, keep] * scale
     # else: y already has ≤6 columns (pre-processed or different circuit), use as-is
 
-    # Augmented channels (negated)
-    for ch in range(n_input_channels):
-        new_x[:, :, n_input_channels + ch] = x[:, :, ch] * -1
-
     x_train, x_test, y_train, y_test = train_test_split(
         new_x, y, test_size=test_size, random_state=random_state
     )
@@ -97,7 +248,7 @@ def load_and_preprocess_data(file_path_or_buffer, test_size=0.2, random_state=42
     return x_train, x_test, y_train, y_test
 
 
-def make_model(input_shape, n_outputs=6):
+def make_model(input_shape, n_outputs=6, mixed_precision=False):
     """
     Build an optimized Conv1D → Dense regression model.
 
@@ -109,8 +260,12 @@ def make_model(input_shape, n_outputs=6):
     Args:
         input_shape: shape of a single input sample, e.g. (100, 6)
         n_outputs: number of regression targets (default 6)
+        mixed_precision: compute hidden layers in float16 (variables stay
+            float32); the output layer is always float32 for the loss
     """
+    configure_tf_threads()
     initializer = tf.keras.initializers.HeNormal()
+    policy = "mixed_float16" if mixed_precision else None
 
     input_layer = keras.layers.Input(input_shape)
 
@@ -127,33 +282,237 @@ def make_model(input_shape, n_outputs=6):
     for filters, kernel_size in conv_configs:
         x = keras.layers.Conv1D(
             filters=filters, kernel_size=kernel_size, padding="same",
-            activation="relu", kernel_initializer=initializer
+            activation="relu", kernel_initializer=initializer, dtype=policy,
         )(x)
-        x = keras.layers.BatchNormalization()(x)
+        x = keras.layers.BatchNormalization(dtype=policy)(x)
         x = keras.layers.Dropout(0.15)(x)
 
     # --- Dense head ---
-    x = keras.layers.Dense(512, activation="relu", kernel_initializer=initializer)(x)
-    x = keras.layers.Dense(512, activation="relu", kernel_initializer=initializer)(x)
-    x = keras.layers.BatchNormalization()(x)
-    x = keras.layers.Flatten()(x)
+    x = keras.layers.Dense(512, activation="relu", kernel_initializer=initializer, dtype=policy)(x)
+    x = keras.layers.Dense(512, activation="relu", kernel_initializer=initializer, dtype=policy)(x)
+    x = keras.layers.BatchNormalization(dtype=policy)(x)
+    x = keras.layers.Flatten(dtype=policy)(x)
     x = keras.layers.Dropout(0.25)(x)
 
-    x = keras.layers.Dense(128, activation="relu", kernel_initializer=initializer)(x)
+    x = keras.layers.Dense(128, activation="relu", kernel_initializer=initializer, dtype=policy)(x)
     x = keras.layers.Dropout(0.15)(x)
-    x = keras.layers.Dense(64, activation="relu", kernel_initializer=initializer)(x)
+    x = keras.layers.Dense(64, activation="relu", kernel_initializer=initializer, dtype=policy)(x)
 
-    output_layer = keras.layers.Dense(n_outputs)(x)
+    output_layer = keras.layers.Dense(n_outputs, dtype="float32")(x)
 
     return keras.models.Model(inputs=input_layer, outputs=output_layer)
 
 
+def _is_layer_chain(model):
+    """True when every layer is called once, on exactly the previous layer's output."""
+    if len(model.inputs) != 1 or len(model.outputs) != 1:
+        return False
+    prev = model.inputs[0]
+    for layer in model.layers:
+        if isinstance(layer, keras.layers.InputLayer):
+            continue
+        if layer.input is not prev:
+            return False
+        prev = layer.output
+    return prev is model.outputs[0]
+
+
+def fuse_bn_for_inference(model):
+    """
+    Return an inference-only copy of a sequential Keras model with its
+    BatchNormalization layers folded into neighbouring weights and its
+    Dropout layers removed (both are fixed affine / identity maps once
+    training is over).
+
+    A BN layer y = w·x + b (w = γ/√(σ²+ε), b = β − μ·w) is folded
+      - backward into a preceding Conv1D/Dense with linear activation:
+        K ← K·w, bias ← bias·w + b
+      - otherwise forward into the next Dense (through any Dropout/Flatten):
+        K ← w[:, None]·K, bias ← bias + b·K
+    BN layers followed by a zero-padded Conv1D (as in make_model's conv
+    blocks, where BN sits after the ReLU) are kept, since folding there
+    would be inexact at the padded edges.
+
+    Models that are not a strict layer chain (branches, merges, shared
+    layers, several inputs/outputs) are returned unchanged.
+    """
+    _require_tf()
+    if not _is_layer_chain(model):
+        return model
+    inputs = keras.layers.Input(model.input_shape[1:])
+    x = inputs
+    for cls, cfg, weights in _folded_layer_specs(model):
+        layer = cls.from_config(cfg)
+        x = layer(x)
+        layer.set_weights(weights)
+    return keras.models.Model(inputs=inputs, outputs=x)
+
+
+def _folded_layer_specs(model):
+    """(class, config, weights) of each layer left after folding a chain model."""
+    layers = [l for l in model.layers if not isinstance(l, keras.layers.InputLayer)]
+    # Working copies of (config, weights) per layer; folded layers become None
+    specs = [[l.__class__, l.get_config(), l.get_weights()] for l in layers]
+
+    def _is(i, cls):
+        return specs[i] is not None and specs[i][0] is cls
+
+    def _bn_affine(i):
+        cfg, weights = specs[i][1], list(specs[i][2])
+        gamma = weights.pop(0) if cfg.get("scale", True) else 1.0
+        beta = weights.pop(0) if cfg.get("center", True) else 0.0
+        mean, var = weights
+        w = gamma / np.sqrt(var + cfg["epsilon"])
+        return w, beta - mean * w
+
+    for i in range(len(specs)):
+        if specs[i][0] is keras.layers.Dropout:
+            specs[i] = None
+            continue
+        if specs[i][0] is not keras.layers.BatchNormalization:
+            continue
+        if specs[i][1].get("axis", -1) not in (-1, [-1], len(layers[i].output.shape) - 1):
+            continue
+        w, b = _bn_affine(i)
+
+        # Backward: nearest earlier live layer, if linear Conv1D/Dense
+        j = i - 1
+        while j >= 0 and specs[j] is None:
+            j -= 1
+        if j >= 0 and (_is(j, keras.layers.Conv1D) or _is(j, keras.layers.Dense)) \
+                and specs[j][1].get("activation") == "linear":
+            cfg, weights = specs[j][1], specs[j][2]
+            kernel = weights[0] * w
+            bias = (weights[1] if cfg["use_bias"] else 0.0) * w + b
+            cfg["use_bias"] = True
+            specs[j][2] = [kernel, bias]
+            specs[i] = None
+            continue
+
+        # Forward: next Dense, skipping Dropout / Flatten
+        k, tile = i + 1, 1
+        while k < len(specs) and specs[k][0] in (keras.layers.Dropout, keras.layers.Flatten):
+            if specs[k][0] is keras.layers.Flatten:
+                tile = int(np.prod(layers[i].output.shape[1:-1]))
+            k += 1
+        if k < len(specs) and _is(k, keras.layers.Dense):
+            # Flatten interleaves channels per step, so tile the affine
+            w_full, b_full = np.tile(w, tile), np.tile(b, tile)
+            cfg, weights = specs[k][1], specs[k][2]
+            kernel = w_full[:, None] * weights[0]
+            bias = (weights[1] if cfg["use_bias"] else 0.0) + b_full @ weights[0]
+            cfg["use_bias"] = True
+            specs[k][2] = [kernel, bias]
+            specs[i] = None
+
+    return [spec for spec in specs if spec is not None]
+
+
+# model → its XLA-compiled forward function (xla_predict), and trained model →
+# its BN-folded inference copy (evaluate_model); entries go with the model
+_XLA_FORWARD = weakref.WeakKeyDictionary()
+_FUSED_MODELS = weakref.WeakKeyDictionary()
+
+
+def xla_predict(model, x, batch_size=1024):
+    """
+    Keras forward pass compiled with XLA (tf.function(jit_compile=True)), so
+    the layer stack runs as a few fused kernels instead of one dispatch per op.
+
+    The last batch is zero-padded to batch_size so every call reuses the one
+    compiled shape, and the compiled function is kept per model, so repeated
+    calls don't retrace (it reads the model's variables, so weight updates
+    are still seen).
+    """
+    _require_tf()
+    forward = _XLA_FORWARD.get(model)
+    if forward is None:
+        # Weak reference, or the cached function would keep its key alive
+        model_ref = weakref.ref(model)
+        forward = tf.function(lambda t: model_ref()(t, training=False), jit_compile=True)
+        _XLA_FORWARD[model] = forward
+    x = np.asarray(x, dtype=np.float32)
+    n = len(x)
+    if n == 0:
+        return np.empty((0,) + tuple(model.output_shape[1:]), dtype=np.float32)
+    batch_size = min(batch_size, n)
+    out = []
+    for start in range(0, n, batch_size):
+        chunk = x[start:start + batch_size]
+        if len(chunk) < batch_size:
+            chunk = np.concatenate([chunk, np.zeros((batch_size - len(chunk),) + x.shape[1:], x.dtype)])
+        out.append(np.asarray(forward(tf.constant(chunk))))
+    return np.concatenate(out)[:n]
+
+
+def gpu_available():
+    """
+    True when XGBoost was built with CUDA support and CuPy can see at least
+    one CUDA device.
+    """
+    if not XGB_AVAILABLE:
+        return False
+    try:
+        import xgboost
+        import cupy
+        return bool(xgboost.build_info().get("USE_CUDA")) and cupy.cuda.runtime.getDeviceCount() > 0
+    except Exception:
+        return False
+
+
+def make_boosting_regressor(use_gpu=False, n_jobs=None):
+    """
+    Build the single-output gradient-boosting learner used for the
+    spectrum → parameter regression (wrap in MultiOutputRegressor).
+
+    Uses XGBoost's histogram method when available, then LightGBM, otherwise
+    scikit-learn's HistGradientBoostingRegressor, all with the same depth /
+    rate / rounds. With use_gpu=True (see gpu_available) XGBoost builds
+    histograms on CUDA.
+
+    n_jobs is the XGBoost / LightGBM thread count (default: all cores, at
+    most 8). When several of these run in parallel workers, pass each its
+    share of the cores. HistGradientBoostingRegressor has no n_jobs and
+    follows the OpenMP limit of the process it runs in.
+    """
+    # Split search stops scaling past ~8 threads
+    n_jobs = min(n_jobs or os.cpu_count() or 1, 8)
+    if XGB_AVAILABLE:
+        return XGBRegressor(
+            n_estimators=300,
+            learning_rate=0.05,
+            max_depth=4,
+            tree_method="hist",
+            device="cuda" if use_gpu else "cpu",
+            n_jobs=n_jobs,
+            random_state=42,
+        )
+    if LGBM_AVAILABLE:
+        return LGBMRegressor(
+            n_estimators=300,
+            learning_rate=0.05,
+            max_depth=4,
+            num_leaves=15,
+            n_jobs=n_jobs,
+            random_state=42,
+            verbose=-1,
+        )
+    return HistGradientBoostingRegressor(
+        max_iter=300,
+        learning_rate=0.05,
+        max_depth=4,
+        early_stopping=True,
+        random_state=42,
+    )
+
+
 def get_training_callbacks(patience_lr=8, patience_es=20, min_lr=1e-6):
     """
     Return a list of Keras callbacks for training:
       - ReduceLROnPlateau: halve LR when val_loss stalls
       - EarlyStopping: stop training if no improvement
     """
+    _require_tf()
     callbacks = [
         keras.callbacks.ReduceLROnPlateau(
             monitor="val_loss", factor=0.5, patience=patience_lr,
@@ -175,22 +534,89 @@ def evaluate_model(model, x_test, y_test, n_samples=100):
         y_pred: predicted values
         metrics: dict of {param_name: {r2, mae, mape, mse}}
     """
-    y_pred = model.predict(x_test)
-    y_pred = np.asarray(y_pred)
+    if _is_keras_model(model):
+        fused = _FUSED_MODELS.get(model)
+        if fused is None:
+            fused = fuse_bn_for_inference(model)
+            if fused is not model:
+                _FUSED_MODELS[model] = fused
+        else:
+            # Same graph, so only re-fold the weights (model may have been
+            # trained since); the cached XLA function picks them up
+            fused.set_weights([w for _, _, weights in _folded_layer_specs(model) for w in weights])
+        y_pred = xla_predict(fused, x_test)
+    else:
+        y_pred = np.asarray(model.predict(x_test))
+
+    return y_pred, _param_metrics(y_test, y_pred, n_samples)
+
+
+def quantize_int8(model, x_calib, n_calib=200):
+    """
+    Post-training INT8 quantization of a Keras model to a TFLite flatbuffer.
+
+    Weights and activations are int8 (activation ranges calibrated on the
+    first n_calib samples of x_calib); input and output stay float32.
+    Returns the flatbuffer bytes for evaluate_model_tflite.
+    """
+    _require_tf()
+    x_calib = np.asarray(x_calib[:n_calib], dtype=np.float32)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: ([sample[None]] for sample in x_calib)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
 
+
+def evaluate_model_tflite(tflite_model, x_test, y_test, n_samples=100):
+    """
+    evaluate_model for a TFLite flatbuffer (see quantize_int8): the whole
+    test set runs as one batch through the interpreter on all CPU cores.
+    Uses the LiteRT interpreter when ai_edge_litert is installed, otherwise
+    tf.lite.Interpreter.
+
+    Returns:
+        y_pred: predicted values
+        metrics: dict of {param_name: {r2, mae, mape, mse}}
+    """
+    if LITERT_AVAILABLE:
+        interpreter_cls = LiteRTInterpreter
+    else:
+        interpreter_cls = _require_tf()[0].lite.Interpreter
+    x_test = np.asarray(x_test, dtype=np.float32)
+    interpreter = interpreter_cls(model_content=tflite_model, num_threads=os.cpu_count())
+    input_index = interpreter.get_input_details()[0]["index"]
+    interpreter.resize_tensor_input(input_index, x_test.shape)
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(input_index, x_test)
+    interpreter.invoke()
+    y_pred = interpreter.get_tensor(interpreter.get_output_details()[0]["index"])
+
+    return y_pred, _param_metrics(y_test, y_pred, n_samples)
+
+
+def _param_metrics(y_test, y_pred, n_samples):
+    """Per-parameter R² / MAE / MAPE / MSE over the first n_samples rows."""
     # Determine how many parameters to evaluate
     n_params = min(y_test.shape[1], len(PARAM_NAMES))
 
-    metrics = {}
-    for i in range(n_params):
-        name = PARAM_NAMES[i]
-        a = y_test[:n_samples, i]
-        b = y_pred[:n_samples, i]
-        metrics[name] = {
-            "R²": r2_score(a, b),
-            "MAE": mean_absolute_error(a, b),
-            "MAPE (%)": mean_absolute_percentage_error(a, b) * 100,
-            "MSE": mean_squared_error(a, b),
-        }
-
-    return y_pred, metrics
+    # One pass over the residuals for all four metrics, column-wise; same
+    # edge cases as sklearn's raw_values scorers (eps floor in MAPE, R² of
+    # a constant column is 1 if predicted exactly, else 0)
+    a = np.asarray(y_test[:n_samples, :n_params], dtype=np.float64)
+    b = np.asarray(y_pred[:n_samples, :n_params], dtype=np.float64)
+    diff = b - a
+    abs_diff = np.abs(diff)
+    mae = abs_diff.mean(axis=0)
+    mse = np.square(diff).mean(axis=0)
+    mape = (abs_diff / np.maximum(np.abs(a), np.finfo(np.float64).eps)).mean(axis=0) * 100
+    ss_res = mse * len(a)
+    ss_tot = np.square(a - a.mean(axis=0)).sum(axis=0)
+    r2 = np.where(ss_res == 0, 1.0, 0.0)
+    nz = ss_tot != 0
+    r2[nz] = 1 - ss_res[nz] / ss_tot[nz]
+
+    return {
+        name: {"R²": r2[i], "MAE": mae[i], "MAPE (%)": mape[i], "MSE": mse[i]}
+        for i, name in enumerate(PARAM_NAMES[:n_params])
+    }